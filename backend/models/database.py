@@ -2,19 +2,81 @@
 Simple SQLite Database for storing collected data
 """
 import sqlite3
-import json
+import threading
+import orjson
+from itertools import chain, islice
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List
 import logging
 import os
+from contextlib import contextmanager
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of cached game query results
+RESULTS_CACHE_SIZE = 32
+
+# Columns written for every game row, in bind order
+GAME_COLUMNS = (
+    'espn_id', 'game_date', 'home_team_id', 'home_team_name',
+    'away_team_id', 'away_team_name', 'status', 'home_score',
+    'away_score', 'weather_data', 'raw_data', 'created_at', 'updated_at'
+)
+
+# Conservative bound-parameter limit (SQLite's historical default)
+SQLITE_MAX_VARIABLES = 999
+
+INSERT_PREDICTION_SQL = '''
+    INSERT INTO predictions (
+        game_id, predicted_winner, confidence, prediction_type,
+        factors, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+STATS_SQL = '''
+    SELECT
+        (SELECT COUNT(*) FROM games),
+        (SELECT COUNT(*) FROM teams),
+        (SELECT COUNT(*) FROM predictions)
+'''
+
+def _dumps(data) -> str:
+    """Serialize to a JSON string for TEXT columns"""
+    return orjson.dumps(data, default=str).decode()
+
+# Every full chunk reuses one SQL string, and with it the connection's prepared statement
+@lru_cache(maxsize=64)
+def _insert_games_sql(columns: tuple, row_count: int) -> str:
+    """Build the INSERT OR REPLACE statement for row_count game rows"""
+    row_placeholders = '(' + ', '.join('?' * len(columns)) + ')'
+    return (
+        f"INSERT OR REPLACE INTO games ({', '.join(columns)}) VALUES "
+        + ', '.join([row_placeholders] * row_count)
+    )
+
+def bulk_insert_games(conn: sqlite3.Connection, rows: Iterable[tuple],
+                      columns: tuple = GAME_COLUMNS) -> int:
+    """Insert or replace game rows using multi-row VALUES statements (rows may be a generator)"""
+    rows_per_stmt = SQLITE_MAX_VARIABLES // len(columns)
+    
+    # Only one chunk of rows is materialized at a time
+    rows = iter(rows)
+    count = 0
+    while chunk := list(islice(rows, rows_per_stmt)):
+        conn.execute(_insert_games_sql(columns, len(chunk)), list(chain.from_iterable(chunk)))
+        count += len(chunk)
+    
+    return count
+
 class SportsDatabase:
     """Simple SQLite database for sports data"""
     
     def __init__(self, db_path: str = "data/sports_betting.db"):
         self.db_path = db_path
+        # Per-thread connection and game query cache
+        self._local = threading.local()
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -22,9 +84,96 @@ class SportsDatabase:
         self.init_database()
         logger.info(f"Database initialized: {db_path}")
     
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's persistent connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+        
+        return conn
+    
+    @contextmanager
+    def _connection(self):
+        """This thread's connection; commits on success unless a transaction() is open"""
+        conn = self._conn()
+        
+        if getattr(self._local, 'in_transaction', False):
+            yield conn
+        else:
+            with conn:
+                yield conn
+    
+    @contextmanager
+    def transaction(self):
+        """Group several saves on this thread into one transaction (a single commit)"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        self._local.in_transaction = True
+        
+        try:
+            yield self
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.in_transaction = False
+            self._invalidate_cache()
+    
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def _results_cache(self) -> OrderedDict:
+        """This thread's cached game rows, dropped once any other connection has committed"""
+        # data_version changes when another connection (any instance or process) commits
+        version = self._conn().execute('PRAGMA data_version').fetchone()[0]
+        cache = getattr(self._local, 'results_cache', None)
+        
+        if cache is None or self._local.cache_version != version:
+            cache = self._local.results_cache = OrderedDict()
+            self._local.cache_version = version
+        
+        return cache
+    
+    def _invalidate_cache(self):
+        """Drop cached rows after a write on this thread's connection (data_version doesn't see those)"""
+        self._local.results_cache = None
+    
+    def _query_games(self, key: tuple, query: str, params, parse_json: bool) -> List[Dict]:
+        """Run a games query, reusing its rows until the database changes"""
+        cache = self._results_cache()
+        rows = cache.get(key)
+        
+        if rows is None:
+            with self._connection() as conn:
+                rows = [dict(row) for row in conn.execute(query, params)]
+            cache[key] = rows
+            if len(cache) > RESULTS_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        
+        # Fresh dicts (and freshly parsed JSON) on every call, so callers can't alter the cache
+        return self._rows_to_games(rows, parse_json)
+    
     def init_database(self):
         """Initialize database tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
+            # WAL lets readers and writers proceed concurrently (persistent setting)
+            conn.execute('PRAGMA journal_mode=WAL')
+            
             # Games table
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS games (
@@ -75,135 +224,224 @@ class SportsDatabase:
                 )
             ''')
             
+            # Indexes for date-ordered and status-filtered game queries
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_games_date ON games(game_date DESC)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_games_status ON games(status, game_date)')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_games_matchup
+                ON games(home_team_id, away_team_id, game_date DESC)
+            ''')
+            
             conn.commit()
     
     def save_games(self, games_data: List[Dict]) -> int:
         """Save games data to database"""
-        saved_count = 0
-        
-        with sqlite3.connect(self.db_path) as conn:
-            for game in games_data:
-                try:
-                    # Insert or update game
-                    conn.execute('''
-                        INSERT OR REPLACE INTO games (
-                            espn_id, game_date, home_team_id, home_team_name,
-                            away_team_id, away_team_name, status, home_score,
-                            away_score, weather_data, raw_data, created_at, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        game.get('espn_id'),
-                        game.get('date'),
-                        game.get('home_team', {}).get('id'),
-                        game.get('home_team', {}).get('name'),
-                        game.get('away_team', {}).get('id'),
-                        game.get('away_team', {}).get('name'),
-                        game.get('status'),
-                        game.get('home_team', {}).get('score', 0),
-                        game.get('away_team', {}).get('score', 0),
-                        json.dumps(game.get('weather', {})),
-                        json.dumps(game),
-                        datetime.now().isoformat(),
-                        datetime.now().isoformat()
-                    ))
-                    saved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error saving game {game.get('espn_id')}: {e}")
-            
-            conn.commit()
+        now = datetime.now().isoformat()
+        rows = []
         
+        for game in games_data:
+            try:
+                home = game.get('home_team') or {}
+                away = game.get('away_team') or {}
+                rows.append((
+                    game.get('espn_id'),
+                    game.get('date'),
+                    home.get('id'),
+                    home.get('name'),
+                    away.get('id'),
+                    away.get('name'),
+                    game.get('status'),
+                    home.get('score', 0),
+                    away.get('score', 0),
+                    _dumps(game.get('weather', {})),
+                    # Weather is already stored in its own column
+                    _dumps({k: v for k, v in game.items() if k != 'weather'}),
+                    now,
+                    now
+                ))
+                
+            except Exception as e:
+                logger.error(f"Error saving game {game.get('espn_id')}: {e}")
+        
+        try:
+            with self._connection() as conn:
+                # Insert or update games many rows per statement
+                bulk_insert_games(conn, rows)
+        except sqlite3.Error as e:
+            logger.error(f"Error saving games batch: {e}")
+            # Inside transaction() the error must reach it, so the whole transaction rolls back
+            if getattr(self._local, 'in_transaction', False):
+                raise
+            return 0
+        
+        self._invalidate_cache()
+        
+        saved_count = len(rows)
         logger.info(f"Saved {saved_count} games to database")
         return saved_count
     
     def save_teams(self, teams_data: List[Dict]) -> int:
         """Save teams data to database"""
-        saved_count = 0
-        
-        with sqlite3.connect(self.db_path) as conn:
-            for team in teams_data:
-                try:
-                    conn.execute('''
-                        INSERT OR REPLACE INTO teams (
-                            espn_id, name, abbreviation, city, last_updated
-                        ) VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        team.get('id'),
-                        team.get('name'),
-                        team.get('abbreviation'),
-                        team.get('location'),
-                        datetime.now().isoformat()
-                    ))
-                    saved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error saving team {team.get('name')}: {e}")
-            
-            conn.commit()
+        now = datetime.now().isoformat()
+        rows = []
+        
+        for team in teams_data:
+            try:
+                rows.append((
+                    team.get('id'),
+                    team.get('name'),
+                    team.get('abbreviation'),
+                    team.get('location'),
+                    now
+                ))
+                
+            except Exception as e:
+                logger.error(f"Error saving team {team.get('name')}: {e}")
         
+        try:
+            with self._connection() as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO teams (
+                        espn_id, name, abbreviation, city, last_updated
+                    ) VALUES (?, ?, ?, ?, ?)
+                ''', rows)
+        except sqlite3.Error as e:
+            logger.error(f"Error saving teams batch: {e}")
+            # Inside transaction() the error must reach it, so the whole transaction rolls back
+            if getattr(self._local, 'in_transaction', False):
+                raise
+            return 0
+        
+        saved_count = len(rows)
         logger.info(f"Saved {saved_count} teams to database")
         return saved_count
     
-    def get_games(self, limit: int = 50) -> List[Dict]:
-        """Get games from database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('''
-                SELECT * FROM games 
-                ORDER BY game_date DESC 
-                LIMIT ?
-            ''', (limit,))
-            
-            games = []
-            for row in cursor.fetchall():
-                game = dict(row)
-                # Parse JSON fields
-                if game['weather_data']:
-                    game['weather'] = json.loads(game['weather_data'])
-                if game['raw_data']:
-                    game['raw'] = json.loads(game['raw_data'])
-                games.append(game)
-            
-            return games
+    def get_games(self, limit: int = 50, parse_json: bool = True) -> List[Dict]:
+        """Get games from database (set parse_json=False to skip decoding JSON fields)"""
+        return self._query_games(('games', limit), '''
+            SELECT * FROM games 
+            ORDER BY game_date DESC 
+            LIMIT ?
+        ''', (limit,), parse_json)
+    
+    def get_completed_games(self, limit: int = 500, start_date: str = None,
+                            end_date: str = None, parse_json: bool = True) -> List[Dict]:
+        """Get completed games (final or with a score), optionally within a date range"""
+        conditions = ["(status = 'STATUS_FINAL' OR home_score > 0 OR away_score > 0)"]
+        params = []
+        
+        if start_date:
+            conditions.append('game_date >= ?')
+            params.append(start_date)
+        if end_date:
+            conditions.append('game_date <= ?')
+            params.append(end_date)
+        
+        params.append(limit)
+        
+        return self._query_games(('completed', limit, start_date, end_date), f'''
+            SELECT * FROM games 
+            WHERE {' AND '.join(conditions)}
+            ORDER BY game_date DESC 
+            LIMIT ?
+        ''', params, parse_json)
+    
+    def get_matchups(self, team1_id: str, team2_id: str, limit: int = None,
+                     recent_games: int = None, parse_json: bool = False) -> List[Dict]:
+        """Get games between two teams (either side at home), newest first
+        
+        recent_games restricts the search to that many most recent games overall.
+        """
+        conditions = ['((home_team_id = :a AND away_team_id = :b) OR (home_team_id = :b AND away_team_id = :a))']
+        params = {'a': team1_id, 'b': team2_id}
+        
+        if recent_games is not None:
+            conditions.append('rowid IN (SELECT rowid FROM games ORDER BY game_date DESC LIMIT :recent)')
+            params['recent'] = recent_games
+        
+        query = f'''
+            SELECT * FROM games 
+            WHERE {' AND '.join(conditions)}
+            ORDER BY game_date DESC
+        '''
+        if limit is not None:
+            query += ' LIMIT :limit'
+            params['limit'] = limit
+        
+        key = ('matchups', *sorted((team1_id, team2_id)), limit, recent_games)
+        return self._query_games(key, query, params, parse_json)
+    
+    def _rows_to_games(self, rows: List[Dict], parse_json: bool = True) -> List[Dict]:
+        """Convert game rows to dicts, optionally parsing JSON fields"""
+        if not parse_json:
+            return [dict(row) for row in rows]
+        
+        games = []
+        for row in rows:
+            game = dict(row)
+            # Parse JSON fields
+            if game['weather_data']:
+                game['weather'] = orjson.loads(game['weather_data'])
+            if game['raw_data']:
+                game['raw'] = orjson.loads(game['raw_data'])
+            games.append(game)
+        
+        return games
     
     def get_teams(self) -> List[Dict]:
         """Get all teams from database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.execute('SELECT * FROM teams ORDER BY name')
             
             return [dict(row) for row in cursor.fetchall()]
     
     def save_prediction(self, prediction: Dict) -> int:
         """Save a prediction to database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                INSERT INTO predictions (
-                    game_id, predicted_winner, confidence, prediction_type,
-                    factors, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                prediction.get('game_id'),
-                prediction.get('predicted_winner'),
-                prediction.get('confidence'),
-                prediction.get('prediction_type', 'general'),
-                json.dumps(prediction.get('factors', [])),
-                datetime.now().isoformat()
-            ))
-            
-            conn.commit()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                INSERT_PREDICTION_SQL,
+                self._prediction_row(prediction, datetime.now().isoformat())
+            )
             return cursor.lastrowid
     
+    def save_predictions(self, predictions: List[Dict]) -> int:
+        """Save a batch of predictions in a single transaction"""
+        now = datetime.now().isoformat()
+        rows = [self._prediction_row(prediction, now) for prediction in predictions]
+        
+        with self._connection() as conn:
+            cursor = conn.executemany(INSERT_PREDICTION_SQL, rows)
+            return cursor.rowcount
+    
+    def _prediction_row(self, prediction: Dict, created_at: str) -> tuple:
+        """Build the INSERT parameters for one prediction (pre-serialized factors_json wins)"""
+        factors_json = prediction.get('factors_json')
+        if factors_json is None:
+            factors_json = _dumps(prediction.get('factors', []))
+        
+        return (
+            prediction.get('game_id'),
+            prediction.get('predicted_winner'),
+            prediction.get('confidence'),
+            prediction.get('prediction_type', 'general'),
+            factors_json,
+            created_at
+        )
+    
     def get_database_stats(self) -> Dict:
         """Get database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            games_count = conn.execute('SELECT COUNT(*) FROM games').fetchone()[0]
-            teams_count = conn.execute('SELECT COUNT(*) FROM teams').fetchone()[0]
-            predictions_count = conn.execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
-            
-            return {
-                'games': games_count,
-                'teams': teams_count,
-                'predictions': predictions_count,
-                'database_size': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-            }
\ No newline at end of file
+        with self._connection() as conn:
+            # All three counts in one statement
+            games_count, teams_count, predictions_count = conn.execute(STATS_SQL).fetchone()
+        
+        try:
+            database_size = os.stat(self.db_path).st_size
+        except FileNotFoundError:
+            database_size = 0
+        
+        return {
+            'games': games_count,
+            'teams': teams_count,
+            'predictions': predictions_count,
+            'database_size': database_size
+        }
\ No newline at end of file
@@ -5,18 +5,34 @@ Test prediction algorithm against historical data
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
+import operator
+import numpy as np
 from ..models.database import SportsDatabase
 from .prediction_engine import AdvancedPredictionEngine
-import json
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Confidence buckets and their lower edges (the first bucket covers everything below 60)
+CONFIDENCE_BUCKETS = ('50-60%', '60-70%', '70-80%', '80%+')
+CONFIDENCE_EDGES = (60, 70, 80)
+
+# Factor attributes recorded with each backtest prediction
+FACTOR_FIELDS = ('name', 'value', 'weight')
+_get_factor_fields = operator.attrgetter(*FACTOR_FIELDS)
+
 class Backtester:
     """Backtest prediction algorithms against historical data"""
     
-    def __init__(self):
+    def __init__(self, offline: bool = False):
         self.database = SportsDatabase()
         self.prediction_engine = AdvancedPredictionEngine()
+        
+        # Historical games come from the database; offline mode also forbids live collector calls
+        self.offline = offline
+        if offline:
+            self.prediction_engine.data_manager.set_offline()
+        
         logger.info("Initialized backtesting system")
     
     def run_backtest(self, start_date: str = None, end_date: str = None) -> Dict:
@@ -43,44 +59,26 @@ class Backtester:
             'factor_analysis': {}
         }
         
-        total_confidence = 0
-        confidence_buckets = {
-            '50-60%': {'correct': 0, 'total': 0},
-            '60-70%': {'correct': 0, 'total': 0},
-            '70-80%': {'correct': 0, 'total': 0},
-            '80%+': {'correct': 0, 'total': 0}
-        }
+        confidences = []
+        corrects = []
         
+        # Historical games are already limited to completed games by the query
         for game in historical_games:
-            # Only analyze completed games
-            if not self._is_game_completed(game):
-                continue
-            
             # Generate prediction for this historical game
             prediction = self._predict_historical_game(game)
             
             if not prediction:
                 continue
             
-            results['completed_games'] += 1
-            
             # Check if prediction was correct
             actual_winner = self._get_actual_winner(game)
             predicted_winner = prediction.predicted_winner
             
             is_correct = actual_winner == predicted_winner
-            
-            if is_correct:
-                results['correct_predictions'] += 1
-            
-            # Track confidence buckets
             confidence = prediction.confidence
-            total_confidence += confidence
             
-            bucket = self._get_confidence_bucket(confidence)
-            confidence_buckets[bucket]['total'] += 1
-            if is_correct:
-                confidence_buckets[bucket]['correct'] += 1
+            confidences.append(confidence)
+            corrects.append(is_correct)
             
             # Store prediction result
             results['predictions'].append({
@@ -91,21 +89,31 @@ class Backtester:
                 'confidence': confidence,
                 'correct': is_correct,
                 'factors': [
-                    {
-                        'name': f.name,
-                        'value': f.value,
-                        'weight': f.weight
-                    }
+                    dict(zip(FACTOR_FIELDS, _get_factor_fields(f)))
                     for f in prediction.factors
                 ]
             })
         
         # Calculate final metrics
+        confidence_array = np.asarray(confidences, dtype=float)
+        correct_array = np.asarray(corrects, dtype=bool)
+        
+        results['completed_games'] = len(confidences)
+        results['correct_predictions'] = int(correct_array.sum())
+        
         if results['completed_games'] > 0:
             results['accuracy'] = results['correct_predictions'] / results['completed_games']
-            results['avg_confidence'] = total_confidence / results['completed_games']
+            results['avg_confidence'] = float(confidence_array.mean())
+        
+        # Bucket every prediction by confidence in one pass
+        bucket_idx = np.digitize(confidence_array, CONFIDENCE_EDGES)
+        bucket_totals = np.bincount(bucket_idx, minlength=len(CONFIDENCE_BUCKETS))
+        bucket_correct = np.bincount(bucket_idx, weights=correct_array, minlength=len(CONFIDENCE_BUCKETS))
         
-        results['performance_by_confidence'] = confidence_buckets
+        results['performance_by_confidence'] = {
+            bucket: {'correct': int(bucket_correct[i]), 'total': int(bucket_totals[i])}
+            for i, bucket in enumerate(CONFIDENCE_BUCKETS)
+        }
         results['factor_analysis'] = self._analyze_factors(results['predictions'])
         
         logger.info(f"Backtest complete: {results['accuracy']:.1%} accuracy on {results['completed_games']} games")
@@ -114,21 +122,12 @@ class Backtester:
     def _get_historical_games(self, start_date: str = None, end_date: str = None) -> List[Dict]:
         """Get historical games from database"""
         try:
-            # For now, get all completed games
-            all_games = self.database.get_games(limit=500)
-            
-            # Filter for completed games only
-            completed_games = [
-                game for game in all_games 
-                if self._is_game_completed(game)
-            ]
-            
-            # Apply date filters if provided
-            if start_date or end_date:
-                # Date filtering logic would go here
-                pass
-            
-            return completed_games
+            return self.database.get_completed_games(
+                limit=500,
+                start_date=start_date,
+                end_date=end_date,
+                parse_json=False  # Only scalar fields and weather_data are needed
+            )
             
         except Exception as e:
             logger.error(f"Error getting historical games: {e}")
@@ -142,6 +141,12 @@ class Backtester:
     def _predict_historical_game(self, game: Dict) -> Optional:
         """Generate prediction for historical game using current algorithm"""
         try:
+            # Reuse weather already parsed by get_games; otherwise decode once and keep it on the row
+            weather = game.get('weather')
+            if weather is None:
+                weather = orjson.loads(game['weather_data']) if game.get('weather_data') else {}
+                game['weather'] = weather
+            
             # Convert database game format to prediction engine format
             game_data = {
                 'espn_id': game['espn_id'],
@@ -156,7 +161,7 @@ class Backtester:
                     'name': game['away_team_name'],
                     'record': {'wins': 0, 'losses': 0, 'ties': 0}  # Would need historical records
                 },
-                'weather': json.loads(game.get('weather_data', '{}')) if game.get('weather_data') else {}
+                'weather': weather
             }
             
             return self.prediction_engine._predict_single_game(game_data)
@@ -177,46 +182,37 @@ class Backtester:
         else:
             return 'TIE'
     
-    def _get_confidence_bucket(self, confidence: float) -> str:
-        """Categorize prediction confidence"""
-        if confidence >= 80:
-            return '80%+'
-        elif confidence >= 70:
-            return '70-80%'
-        elif confidence >= 60:
-            return '60-70%'
-        else:
-            return '50-60%'
-    
     def _analyze_factors(self, predictions: List[Dict]) -> Dict:
         """Analyze which factors contribute most to accuracy"""
-        factor_performance = {}
+        # Map each factor name to a column index, flattening factor values as we go
+        factor_index = {}
+        idxs = []
+        values = []
+        correct = []
         
         for pred in predictions:
             is_correct = pred['correct']
             
             for factor in pred['factors']:
-                name = factor['name']
-                
-                if name not in factor_performance:
-                    factor_performance[name] = {
-                        'total_predictions': 0,
-                        'correct_predictions': 0,
-                        'avg_impact': 0,
-                        'accuracy': 0
-                    }
-                
-                factor_performance[name]['total_predictions'] += 1
-                factor_performance[name]['avg_impact'] += abs(factor['value'])
-                
-                if is_correct:
-                    factor_performance[name]['correct_predictions'] += 1
-        
-        # Calculate averages
-        for name, stats in factor_performance.items():
-            if stats['total_predictions'] > 0:
-                stats['accuracy'] = stats['correct_predictions'] / stats['total_predictions']
-                stats['avg_impact'] = stats['avg_impact'] / stats['total_predictions']
+                idxs.append(factor_index.setdefault(factor['name'], len(factor_index)))
+                values.append(factor['value'])
+                correct.append(is_correct)
+        
+        n = len(factor_index)
+        idxs = np.asarray(idxs, dtype=np.intp)
+        totals = np.bincount(idxs, minlength=n)
+        correct_totals = np.bincount(idxs, weights=np.asarray(correct, dtype=float), minlength=n)
+        impact_totals = np.bincount(idxs, weights=np.abs(np.asarray(values, dtype=float)), minlength=n)
+        
+        factor_performance = {}
+        for name, i in factor_index.items():
+            total = int(totals[i])
+            factor_performance[name] = {
+                'total_predictions': total,
+                'correct_predictions': int(correct_totals[i]),
+                'avg_impact': float(impact_totals[i]) / total,
+                'accuracy': float(correct_totals[i]) / total
+            }
         
         return factor_performance
     
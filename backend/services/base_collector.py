@@ -2,63 +2,247 @@
 Base Data Collector
 Abstract base class for all data collectors
 """
+import atexit
+import os
+import queue
 import requests
+import sqlite3
+import threading
 import time
 import json
+import orjson
 from abc import ABC, abstractmethod
+from contextlib import closing
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import logging
+from requests.adapters import HTTPAdapter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class RateLimiter:
+# Connection pool size for the shared HTTP session
+POOL_SIZE = 20
+
+_shared_session = None
+_session_lock = threading.Lock()
+
+def get_shared_session() -> requests.Session:
+    """Get the process-wide HTTP session, creating it on first use"""
+    global _shared_session
+    
+    with _session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            
+            # Pooled keep-alive connections reused by every collector
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            
+            # Set default headers
+            session.headers.update({
+                'User-Agent': 'GreenGuruSports/1.0 (Sports Analytics Tool)',
+                'Accept': 'application/json',
+                'Accept-Encoding': 'gzip, deflate'
+            })
+            
+            _shared_session = session
+    
+    return _shared_session
+
+# Raw API payloads are appended to one NDJSON log per data type
+RAW_DATA_DIR = "data/raw"
+RAW_QUEUE_SIZE = 256  # Payloads waiting for the writer before new ones are dropped
+
+_raw_write_queue = queue.Queue(maxsize=RAW_QUEUE_SIZE)
+_raw_writer = None
+_raw_writer_lock = threading.Lock()
+
+def _raw_writer_loop():
+    """Append queued raw payloads to their NDJSON logs, flushing whenever the queue drains"""
+    handles = {}
+    
+    while True:
+        data_type, payload = _raw_write_queue.get()
+        try:
+            handle = handles.get(data_type)
+            if handle is None:
+                handle = open(os.path.join(RAW_DATA_DIR, f"{data_type}.ndjson"), 'ab')
+                handles[data_type] = handle
+            handle.write(payload + b"\n")
+            
+            if _raw_write_queue.empty():
+                for handle in handles.values():
+                    handle.flush()
+        except Exception as e:
+            logger.error(f"Failed to save raw data: {e}")
+        finally:
+            _raw_write_queue.task_done()
+
+def _queue_raw_data(data_type: str, payload: bytes):
+    """Hand a serialized payload to the background writer, starting it on first use"""
+    global _raw_writer
+    
+    with _raw_writer_lock:
+        if _raw_writer is None:
+            _raw_writer = threading.Thread(target=_raw_writer_loop, name="raw-data-writer", daemon=True)
+            _raw_writer.start()
+    
+    # Raw logs are debugging copies, so never block a collector on a backed-up disk
+    try:
+        _raw_write_queue.put_nowait((data_type, payload))
+    except queue.Full:
+        logger.warning(f"Raw data queue full, dropping {data_type} payload")
+
+def flush_raw_data():
+    """Block until every queued raw payload has been written"""
+    if _raw_writer is not None:
+        _raw_write_queue.join()
+
+atexit.register(flush_raw_data)
+
+class ResponseCache:
+    """SQLite-backed cache of parsed API responses, shared by every process on the machine"""
+    
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int = 256):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._ready = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        
+        if not self._ready:
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        stored_at REAL,
+                        payload BLOB
+                    )
+                ''')
+            self._ready = True
+        
+        return conn
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key if it is younger than the TTL"""
+        if not os.path.exists(self.path):
+            return None
+        
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    'SELECT stored_at, payload FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        
+        # Wall-clock time, since entries are shared across processes
+        if row is None or time.time() - row[0] >= self.ttl:
+            return None
+        return orjson.loads(row[1])
+    
+    def set(self, key: str, data: Any):
+        """Store a response, evicting the oldest entries beyond max_entries"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, stored_at, payload) VALUES (?, ?, ?)',
+                    (key, time.time(), orjson.dumps(data))
+                )
+                conn.execute(
+                    '''DELETE FROM responses WHERE key NOT IN (
+                        SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?
+                    )''',
+                    (self.max_entries,)
+                )
+        except (sqlite3.Error, TypeError) as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+class TokenBucket:
+    """Token-bucket rate limiter: bursts up to capacity, refills at a steady rate"""
+    
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity  # Negative while callers hold reservations they are waiting out
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()  # Collectors may be called from worker threads
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, n: int = 1):
+        """Take n tokens, sleeping until they have been refilled if the bucket is short"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= n
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0
+        
+        # Reserve under the lock but sleep outside it, so concurrent callers queue up
+        # at the refill rate instead of serializing on each other's sleeps
+        if wait_time > 0:
+            logger.info(f"Rate limit reached, sleeping for {wait_time:.1f} seconds")
+            time.sleep(wait_time)
+    
+    @property
+    def available(self) -> float:
+        """Tokens currently in the bucket"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+class RateLimiter(TokenBucket):
     """Simple rate limiter for API calls"""
     
     def __init__(self, max_calls_per_minute: int = 60):
         self.max_calls = max_calls_per_minute
-        self.calls = []
+        super().__init__(rate_per_sec=max_calls_per_minute / 60, capacity=max_calls_per_minute)
     
     def wait_if_needed(self):
         """Wait if we've hit the rate limit"""
-        now = datetime.now()
-        
-        # Remove calls older than 1 minute
-        self.calls = [call_time for call_time in self.calls 
-                     if now - call_time < timedelta(minutes=1)]
-        
-        # If we're at the limit, wait
-        if len(self.calls) >= self.max_calls:
-            sleep_time = 60 - (now - self.calls[0]).total_seconds()
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached, sleeping for {sleep_time:.1f} seconds")
-                time.sleep(sleep_time)
-        
-        # Record this call
-        self.calls.append(now)
+        self.acquire()
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(name: str, max_calls_per_minute: int) -> RateLimiter:
+    """Get the process-wide limiter for an API, so every collector instance shares its budget"""
+    key = (name, max_calls_per_minute)
+    
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(max_calls_per_minute)
+    
+    return limiter
 
 class BaseDataCollector(ABC):
     """Abstract base class for all data collectors"""
     
-    def __init__(self, name: str, base_url: str, rate_limit: int = 60):
+    def __init__(self, name: str, base_url: str, rate_limit: int = 60,
+                 session: Optional[requests.Session] = None):
         self.name = name
         self.base_url = base_url
-        self.rate_limiter = RateLimiter(rate_limit)
-        self.session = requests.Session()
-        
-        # Set default headers
-        self.session.headers.update({
-            'User-Agent': 'GreenGuruSports/1.0 (Sports Analytics Tool)',
-            'Accept': 'application/json',
-            'Accept-Encoding': 'gzip, deflate'
-        })
+        self.rate_limiter = get_rate_limiter(name, rate_limit)
+        self.session = session or get_shared_session()
+        self.offline = False  # When set, requests are refused instead of hitting the network
         
         logger.info(f"Initialized {self.name} collector")
     
     def make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """Make rate-limited HTTP request"""
+        if self.offline:
+            logger.error(f"{self.name} collector is offline, refusing request to {endpoint}")
+            return None
+        
         try:
             # Apply rate limiting
             self.rate_limiter.wait_if_needed()
@@ -70,7 +254,8 @@ class BaseDataCollector(ABC):
             response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
             
-            return response.json()
+            # Decode straight from the response bytes
+            return orjson.loads(response.content)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed for {url}: {e}")
@@ -79,13 +264,12 @@ class BaseDataCollector(ABC):
             logger.error(f"Failed to parse JSON response: {e}")
             return None
     
-    def save_raw_data(self, data: Dict, filename: str):
-        """Save raw data to file for debugging/backup"""
+    def save_raw_data(self, data: Dict, data_type: str, key: str = None, saved_at: str = None):
+        """Queue raw data for the data type's NDJSON log (debugging/backup)"""
         try:
-            filepath = f"data/raw/{filename}"
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-            logger.debug(f"Saved raw data to {filepath}")
+            record = {'saved_at': saved_at or datetime.now().isoformat(), 'key': key, 'data': data}
+            _queue_raw_data(data_type, orjson.dumps(record, default=str))
+            logger.debug(f"Queued raw data for {RAW_DATA_DIR}/{data_type}.ndjson")
         except Exception as e:
             logger.error(f"Failed to save raw data: {e}")
     
@@ -104,7 +288,8 @@ class BaseDataCollector(ABC):
         return {
             'name': self.name,
             'base_url': self.base_url,
-            'last_request_count': len(self.rate_limiter.calls),
+            # Calls drawn from the bucket that have not been refilled yet (~last minute)
+            'last_request_count': max(0, round(self.rate_limiter.max_calls - self.rate_limiter.available)),
             'rate_limit': self.rate_limiter.max_calls,
             'status': 'active'
         }
\ No newline at end of file
@@ -5,24 +5,35 @@ Coordinates data collection from multiple sources
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from .espn_collector import ESPNCollector
 from .weather_collector import WeatherCollector
 from config.api_keys import api_keys
+from config.data_sources import OUTDOOR_STADIUM_IDS
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for each collector probe in test_all_collectors
+COLLECTOR_TEST_TIMEOUT = 10
+
 class DataManager:
     """Manages data collection from all sources"""
     
-    def __init__(self):
-        # Initialize collectors
-        self.espn = ESPNCollector()
-        self.weather = WeatherCollector()
+    def __init__(self, session: Optional[requests.Session] = None):
+        # Initialize collectors (sharing one HTTP session)
+        self.espn = ESPNCollector(session=session)
+        self.weather = WeatherCollector(session=session)
         
         # Track available sources
-        self.available_sources = api_keys.get_available_sources()
+        self.available_sources = api_keys.available_source_set
         logger.info(f"Available data sources: {self.available_sources}")
     
+    def set_offline(self, offline: bool = True):
+        """Stop (or resume) all network requests from this manager's collectors"""
+        self.espn.offline = offline
+        self.weather.offline = offline
+    
     def collect_game_data(self, include_weather: bool = True) -> Dict:
         """Collect comprehensive game data"""
         logger.info("Starting comprehensive game data collection")
@@ -30,6 +41,7 @@ class DataManager:
         result = {
             'collection_time': datetime.now().isoformat(),
             'games': [],
+            'weather_count': 0,  # Games that needed (and were looked up for) weather
             'errors': []
         }
         
@@ -40,29 +52,40 @@ class DataManager:
             result['errors'].append("Failed to collect games data from ESPN")
             return result
         
+        # Fetch weather for every outdoor game in one concurrent batch
+        weather_enabled = include_weather and 'weather' in self.available_sources
+        needed = []
+        if weather_enabled:
+            needed = [game for game in games_data['games'] if game.get('weather_needed', False)]
+        
+        # Indoor venues never need weather, whatever the source flagged
+        needed = [game for game in needed if game['home_team']['id'] in OUTDOOR_STADIUM_IDS]
+        weather_results = {}
+        
+        if needed:
+            weather_by_team = self.weather.collect_data(
+                'game_weather_batch', team_ids=[game['home_team']['id'] for game in needed]
+            )
+            for game in needed:
+                weather_results[game['espn_id']] = weather_by_team.get(game['home_team']['id'])
+        
         # Enrich games with weather data
+        # The collector's game dicts are freshly built per call, so enrich them in place
         for game in games_data['games']:
-            enriched_game = game.copy()
-            
             # Add weather data if available and needed
-            if (include_weather and 
-                'weather' in self.available_sources and 
-                game.get('weather_needed', False)):
-                
-                weather_data = self.weather.collect_data(
-                    'game_weather',
-                    team_id=game['home_team']['id']
-                )
+            if game['espn_id'] in weather_results:
+                weather_data = weather_results[game['espn_id']]
+                result['weather_count'] += 1
                 
                 if weather_data and 'weather' in weather_data:
-                    enriched_game['weather'] = weather_data['weather']
+                    game['weather'] = weather_data['weather']
                     logger.info(f"Added weather data for {game['home_team']['name']} game")
                 else:
-                    enriched_game['weather'] = {'status': 'unavailable'}
+                    game['weather'] = {'status': 'unavailable'}
             else:
-                enriched_game['weather'] = {'status': 'not_needed'}
+                game['weather'] = {'status': 'not_needed'}
             
-            result['games'].append(enriched_game)
+            result['games'].append(game)
         
         logger.info(f"Collected data for {len(result['games'])} games")
         return result
@@ -83,11 +106,13 @@ class DataManager:
         """Get all data needed for predictions"""
         logger.info(f"Collecting prediction data for team {team_id or 'all teams'}")
         
-        # Collect games
-        games_result = self.collect_game_data(include_weather=True)
-        
-        # Collect team data
-        teams_result = self.collect_team_data()
+        # Collect games and team data concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            games_future = pool.submit(self.collect_game_data, include_weather=True)
+            teams_future = pool.submit(self.collect_team_data)
+            
+            games_result = games_future.result()
+            teams_result = teams_future.result()
         
         # Filter for specific team if requested
         if team_id:
@@ -121,35 +146,35 @@ class DataManager:
         
         results = {
             'espn': {'status': 'unknown', 'error': None},
-            'weather': {'status': 'unknown', 'error': None}
+            'weather': {'status': 'not_configured', 'error': 'API key not provided'}
         }
         
-        # Test ESPN
-        try:
-            espn_data = self.espn.collect_data('teams')
-            if self.espn.validate_data(espn_data):
-                results['espn']['status'] = 'working'
-            else:
-                results['espn']['status'] = 'failed'
-                results['espn']['error'] = 'Data validation failed'
-        except Exception as e:
-            results['espn']['status'] = 'error'
-            results['espn']['error'] = str(e)
-        
-        # Test Weather (only if API key is configured)
+        # Live probes are independent: run them concurrently (weather only if API key is configured)
+        probes = {'espn': (self.espn, 'teams', {})}
         if 'weather' in self.available_sources:
+            probes['weather'] = (self.weather, 'current', {'city': 'Miami'})
+        
+        pool = ThreadPoolExecutor(max_workers=len(probes))
+        futures = {
+            name: pool.submit(self._test_collector, collector, data_type, **params)
+            for name, (collector, data_type, params) in probes.items()
+        }
+        for name, future in futures.items():
             try:
-                weather_data = self.weather.collect_data('current', city='Miami')
-                if self.weather.validate_data(weather_data):
-                    results['weather']['status'] = 'working'
-                else:
-                    results['weather']['status'] = 'failed'
-                    results['weather']['error'] = 'Data validation failed'
-            except Exception as e:
-                results['weather']['status'] = 'error'
-                results['weather']['error'] = str(e)
-        else:
-            results['weather']['status'] = 'not_configured'
-            results['weather']['error'] = 'API key not provided'
-        
-        return results
\ No newline at end of file
+                results[name] = future.result(timeout=COLLECTOR_TEST_TIMEOUT)
+            except FutureTimeoutError:
+                results[name] = {'status': 'error', 'error': f'No response within {COLLECTOR_TEST_TIMEOUT}s'}
+        
+        # Don't wait on a stuck probe
+        pool.shutdown(wait=False)
+        return results
+    
+    def _test_collector(self, collector, data_type: str, **params) -> Dict:
+        """Probe one collector with a live request"""
+        try:
+            data = collector.collect_data(data_type, **params)
+            if collector.validate_data(data):
+                return {'status': 'working', 'error': None}
+            return {'status': 'failed', 'error': 'Data validation failed'}
+        except Exception as e:
+            return {'status': 'error', 'error': str(e)}
\ No newline at end of file
@@ -2,25 +2,114 @@
 ESPN Data Collector
 Collects NFL data from ESPN's public API
 """
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-from .base_collector import BaseDataCollector
-from config.data_sources import ESPN_CONFIG, NFL_TEAMS, NFL_STADIUMS
+import requests
+import operator
+import time
+import orjson
+from sys import intern
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from .base_collector import BaseDataCollector, ResponseCache
+from config.data_sources import ESPN_CONFIG, NFL_TEAMS, NFL_STADIUMS, OUTDOOR_STADIUM_IDS, TEAM_ID_INDEX
 
 logger = logging.getLogger(__name__)
 
+# Concurrent requests when fetching stats for many teams
+TEAM_STATS_WORKERS = 8
+
+# Precompiled lookups for the ESPN response schema
+_get_event_fields = operator.itemgetter('id', 'date', 'status')
+_get_team_fields = operator.itemgetter('id', 'displayName', 'abbreviation')
+
+def _get_league_teams(raw_data: Dict) -> List[Dict]:
+    """Walk sports[0].leagues[0].teams in a teams response"""
+    return raw_data['sports'][0]['leagues'][0]['teams']
+
+@dataclass(slots=True, frozen=True)
+class GameRecord:
+    """One parsed ESPN event; to_dict() gives the game dict used downstream"""
+    espn_id: str
+    date: str
+    status: str
+    week: Optional[int]
+    season_type: Optional[int]
+    home_id: str
+    home_idx: Optional[int]
+    home_name: str
+    home_abbreviation: str
+    home_score: Any  # ESPN sends scores as strings
+    home_record: Dict
+    away_id: str
+    away_idx: Optional[int]
+    away_name: str
+    away_abbreviation: str
+    away_score: Any
+    away_record: Dict
+    venue: Dict
+    odds: Dict
+    weather_needed: bool
+    
+    def to_dict(self) -> Dict:
+        return {
+            'espn_id': self.espn_id,
+            'date': self.date,
+            'status': self.status,
+            'week': self.week,
+            'season_type': self.season_type,
+            'home_team': {
+                'id': self.home_id,
+                'idx': self.home_idx,
+                'name': self.home_name,
+                'abbreviation': self.home_abbreviation,
+                'score': self.home_score,
+                'record': self.home_record
+            },
+            'away_team': {
+                'id': self.away_id,
+                'idx': self.away_idx,
+                'name': self.away_name,
+                'abbreviation': self.away_abbreviation,
+                'score': self.away_score,
+                'record': self.away_record
+            },
+            'venue': self.venue,
+            'odds': self.odds,
+            'weather_needed': self.weather_needed
+        }
+
 class ESPNCollector(BaseDataCollector):
     """ESPN API data collector"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         super().__init__(
             name="ESPN",
             base_url=ESPN_CONFIG['base_url'],
-            rate_limit=ESPN_CONFIG['rate_limit']['requests_per_minute']
+            rate_limit=ESPN_CONFIG['rate_limit']['requests_per_minute'],
+            session=session
         )
         self.teams = NFL_TEAMS
         self.stadiums = NFL_STADIUMS
+        
+        # Open-air flag per team index (teams without stadium info are treated as domes)
+        outdoor = [False] * len(TEAM_ID_INDEX)
+        for team_id, idx in TEAM_ID_INDEX.items():
+            outdoor[idx] = team_id in OUTDOOR_STADIUM_IDS
+        self._outdoor_by_idx = tuple(outdoor)
+        
+        # Responses keyed by endpoint, stored serialized so every hit parses a private copy
+        # that callers can't use to alter the cache: {endpoint: (fetched_at, json_bytes)}
+        self._response_cache = {}
+        self._cache_ttl = ESPN_CONFIG['cache']['ttl_seconds']
+        
+        # Second tier on disk, so other collectors and processes reuse the same responses
+        self._disk_cache = ResponseCache(
+            ESPN_CONFIG['cache']['disk_path'],
+            ttl_seconds=self._cache_ttl,
+            max_entries=ESPN_CONFIG['cache']['disk_max_entries']
+        )
     
     def collect_data(self, data_type: str = 'games', **kwargs) -> Dict:
         """Collect different types of ESPN data"""
@@ -33,12 +122,40 @@ class ESPNCollector(BaseDataCollector):
         elif data_type == 'team_stats':
             team_id = kwargs.get('team_id')
             return self._collect_team_stats(team_id)
+        elif data_type == 'all_team_stats':
+            return self.collect_all_team_stats(kwargs.get('team_ids'))
         elif data_type == 'standings':
             return self._collect_standings()
         else:
             logger.error(f"Unknown data type: {data_type}")
             return {}
     
+    def _cached_request(self, endpoint: str) -> Tuple[Optional[Dict], bool]:
+        """Make a request unless a fresh parsed response is cached; returns (data, from_cache)"""
+        now = time.monotonic()
+        cached = self._response_cache.get(endpoint)
+        
+        # Cache hits skip the network and don't count against the rate limit
+        if cached and now - cached[0] < self._cache_ttl:
+            logger.debug(f"Using cached response for {endpoint}")
+            return orjson.loads(cached[1]), True
+        
+        # Offline collectors never see shared state, only what they fetched themselves
+        disk_key = f"{endpoint}|{date.today().isoformat()}"
+        if not self.offline:
+            raw_data = self._disk_cache.get(disk_key)
+            if raw_data:
+                logger.debug(f"Using disk-cached response for {endpoint}")
+                self._response_cache[endpoint] = (now, orjson.dumps(raw_data))
+                return raw_data, True
+        
+        raw_data = self.make_request(endpoint)
+        if raw_data:
+            self._response_cache[endpoint] = (now, orjson.dumps(raw_data))
+            self._disk_cache.set(disk_key, raw_data)
+        
+        return raw_data, False
+    
     def _collect_games(self, date: str = None) -> Dict:
         """Collect current week's games"""
         endpoint = ESPN_CONFIG['endpoints']['scoreboard']
@@ -46,26 +163,42 @@ class ESPNCollector(BaseDataCollector):
         if date:
             endpoint = ESPN_CONFIG['endpoints']['games'].format(date=date)
         
-        raw_data = self.make_request(endpoint)
+        raw_data, from_cache = self._cached_request(endpoint)
         if not raw_data:
             return {}
         
+        collected_at = datetime.now().isoformat()
+        
         # Save raw data for debugging
-        self.save_raw_data(raw_data, f"espn_games_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        if not from_cache:
+            self.save_raw_data(raw_data, 'espn_games', key=date, saved_at=collected_at)
         
         # Process and clean the data
-        games_data = self._process_games_data(raw_data)
+        records = self._parse_game_records(raw_data)
         
         return {
             'source': 'espn',
             'data_type': 'games',
-            'collected_at': datetime.now().isoformat(),
-            'games': games_data
+            'collected_at': collected_at,
+            'games': [record.to_dict() for record in records]
         }
     
     def _process_games_data(self, raw_data: Dict) -> List[Dict]:
         """Process raw ESPN games data into standardized format"""
-        games = []
+        return [record.to_dict() for record in self._parse_game_records(raw_data)]
+    
+    def _parse_game_records(self, raw_data: Dict) -> List[GameRecord]:
+        """Parse raw ESPN events into slotted game records"""
+        records = []
+        
+        # Bind helpers once for the per-event loop
+        extract_record = self._extract_record
+        extract_venue_info = self._extract_venue_info
+        extract_odds = self._extract_odds
+        team_index = TEAM_ID_INDEX
+        outdoor_by_idx = self._outdoor_by_idx
+        get_event_fields = _get_event_fields
+        get_team_fields = _get_team_fields
         
         for event in raw_data.get('events', []):
             try:
@@ -76,53 +209,48 @@ class ESPNCollector(BaseDataCollector):
                 if len(competitors) != 2:
                     continue
                 
-                # Identify home and away teams
-                home_team = None
-                away_team = None
-                
-                for competitor in competitors:
-                    if competitor['homeAway'] == 'home':
-                        home_team = competitor
-                    else:
-                        away_team = competitor
-                
-                if not home_team or not away_team:
+                # Identify home and away teams (exactly one must be home)
+                first, second = competitors
+                first_is_home = first['homeAway'] == 'home'
+                if first_is_home == (second['homeAway'] == 'home'):
                     continue
                 
-                # Extract game information
-                game = {
-                    'espn_id': event['id'],
-                    'date': event['date'],
-                    'status': event['status']['type']['name'],
-                    'week': competition.get('week', {}).get('number'),
-                    'season_type': competition.get('season', {}).get('type'),
-                    'home_team': {
-                        'id': home_team['team']['id'],
-                        'name': home_team['team']['displayName'],
-                        'abbreviation': home_team['team']['abbreviation'],
-                        'score': home_team.get('score', 0),
-                        'record': self._extract_record(home_team)
-                    },
-                    'away_team': {
-                        'id': away_team['team']['id'],
-                        'name': away_team['team']['displayName'],
-                        'abbreviation': away_team['team']['abbreviation'],
-                        'score': away_team.get('score', 0),
-                        'record': self._extract_record(away_team)
-                    },
-                    'venue': self._extract_venue_info(competition),
-                    'odds': self._extract_odds(competition),
-                    'weather_needed': self._needs_weather_data(home_team['team']['id'])
-                }
+                home_team, away_team = (first, second) if first_is_home else (second, first)
+                home_id, home_name, home_abbreviation = map(intern, get_team_fields(home_team['team']))
+                away_id, away_name, away_abbreviation = map(intern, get_team_fields(away_team['team']))
+                espn_id, date, status = get_event_fields(event)
+                home_idx = team_index.get(home_id)
                 
-                games.append(game)
+                # Extract game information
+                records.append(GameRecord(
+                    espn_id=espn_id,
+                    date=date,
+                    status=status['type']['name'],
+                    week=competition.get('week', {}).get('number'),
+                    season_type=competition.get('season', {}).get('type'),
+                    home_id=home_id,
+                    home_idx=home_idx,
+                    home_name=home_name,
+                    home_abbreviation=home_abbreviation,
+                    home_score=home_team.get('score', 0),
+                    home_record=extract_record(home_team),
+                    away_id=away_id,
+                    away_idx=team_index.get(away_id),
+                    away_name=away_name,
+                    away_abbreviation=away_abbreviation,
+                    away_score=away_team.get('score', 0),
+                    away_record=extract_record(away_team),
+                    venue=extract_venue_info(competition),
+                    odds=extract_odds(competition),
+                    weather_needed=home_idx is not None and outdoor_by_idx[home_idx]
+                ))
                 
             except KeyError as e:
                 logger.warning(f"Missing data in game event: {e}")
                 continue
         
-        logger.info(f"Processed {len(games)} games")
-        return games
+        logger.info(f"Processed {len(records)} games")
+        return records
     
     def _extract_record(self, team_data: Dict) -> Dict:
         """Extract team record information"""
@@ -171,25 +299,29 @@ class ESPNCollector(BaseDataCollector):
     
     def _needs_weather_data(self, team_id: str) -> bool:
         """Check if game needs weather data (outdoor stadium)"""
-        return not self.stadiums.get(team_id, {}).get('dome', True)
+        idx = TEAM_ID_INDEX.get(team_id)
+        return idx is not None and self._outdoor_by_idx[idx]
     
     def _collect_teams(self) -> Dict:
         """Collect all NFL teams data"""
         endpoint = ESPN_CONFIG['endpoints']['teams']
-        raw_data = self.make_request(endpoint)
+        raw_data, from_cache = self._cached_request(endpoint)
         
         if not raw_data:
             return {}
         
+        collected_at = datetime.now().isoformat()
+        
         # Save raw data
-        self.save_raw_data(raw_data, f"espn_teams_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        if not from_cache:
+            self.save_raw_data(raw_data, 'espn_teams', saved_at=collected_at)
         
         teams_data = self._process_teams_data(raw_data)
         
         return {
             'source': 'espn',
             'data_type': 'teams',
-            'collected_at': datetime.now().isoformat(),
+            'collected_at': collected_at,
             'teams': teams_data
         }
     
@@ -198,12 +330,13 @@ class ESPNCollector(BaseDataCollector):
         teams = []
         
         try:
-            for team in raw_data['sports'][0]['leagues'][0]['teams']:
+            for team in _get_league_teams(raw_data):
                 team_info = team['team']
+                team_id, name, abbreviation = _get_team_fields(team_info)
                 teams.append({
-                    'id': team_info['id'],
-                    'name': team_info['displayName'],
-                    'abbreviation': team_info['abbreviation'],
+                    'id': team_id,
+                    'name': name,
+                    'abbreviation': abbreviation,
                     'color': team_info.get('color', '#000000'),
                     'logo': team_info.get('logos', [{}])[0].get('href', ''),
                     'location': team_info.get('location', 'Unknown')
@@ -219,22 +352,39 @@ class ESPNCollector(BaseDataCollector):
             return {}
         
         endpoint = ESPN_CONFIG['endpoints']['team_detail'].format(team_id=team_id)
-        raw_data = self.make_request(endpoint)
+        raw_data, from_cache = self._cached_request(endpoint)
         
         if not raw_data:
             return {}
         
+        collected_at = datetime.now().isoformat()
+        
         # Save raw data
-        self.save_raw_data(raw_data, f"espn_team_{team_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        if not from_cache:
+            self.save_raw_data(raw_data, 'espn_team_stats', key=team_id, saved_at=collected_at)
         
         return {
             'source': 'espn',
             'data_type': 'team_stats',
             'team_id': team_id,
-            'collected_at': datetime.now().isoformat(),
+            'collected_at': collected_at,
             'data': raw_data
         }
     
+    def collect_all_team_stats(self, team_ids: List[str] = None) -> Dict[str, Dict]:
+        """Collect stats for many teams concurrently (defaults to every NFL team)"""
+        if team_ids is None:
+            team_ids = [
+                team.id
+                for division in self.teams.values()
+                for team in division.values()
+            ]
+        
+        # Requests are I/O bound; the shared rate limiter still bounds overall QPS
+        with ThreadPoolExecutor(max_workers=TEAM_STATS_WORKERS) as pool:
+            results = pool.map(self._collect_team_stats, team_ids)
+            return dict(zip(team_ids, results))
+    
     def validate_data(self, data: Dict) -> bool:
         """Validate collected ESPN data"""
         if not data:
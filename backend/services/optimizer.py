@@ -3,20 +3,44 @@ Algorithm Optimizer
 Optimize prediction algorithm parameters for best performance
 """
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Tuple
 import logging
 from .backtester import Backtester
-from .prediction_engine import AdvancedPredictionEngine
-import itertools
+from .prediction_engine import AdvancedPredictionEngine, PredictionBatch, FACTOR_NAMES
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+class BacktestResult(NamedTuple):
+    """Outcome of backtesting one weight vector against the evaluation set"""
+    accuracy: float
+    completed_games: int
+    correct_predictions: int
+
+EMPTY_BACKTEST = BacktestResult(0.0, 0, 0)
+
+def _vec_to_dict(vec: np.ndarray) -> Dict:
+    """Convert a weight vector back to a factor_weights dict"""
+    return dict(zip(FACTOR_NAMES, vec.tolist()))
+
 class AlgorithmOptimizer:
     """Optimize prediction algorithm parameters"""
     
-    def __init__(self):
-        self.backtester = Backtester()
+    def __init__(self, offline: bool = True):
+        # Optimization only needs stored historical games, so stay off the network by default
+        self.offline = offline
+        self.backtester = Backtester(offline=offline)
         self.base_engine = AdvancedPredictionEngine()
+        if offline:
+            self.base_engine.data_manager.set_offline()
+        
+        # Weight-independent evaluation set shared by every trial
+        self._cached_games = None
+        self._cached_actuals = None
+        self._factor_matrix = None
+        self._home_won = None
+        self._away_won = None
+        
         logger.info("Initialized algorithm optimizer")
     
     def optimize_factor_weights(self) -> Dict:
@@ -34,35 +58,32 @@ class AlgorithmOptimizer:
             'injuries': [0.02, 0.05, 0.08]
         }
         
-        best_accuracy = 0
+        # Backtest every valid combination in one batched pass
+        test_combinations = self._weight_grid(weight_options)
+        logger.info(f"Testing {len(test_combinations)} weight combinations")
+        trial_results = self._evaluate_weight_matrix(test_combinations)
+        accuracies = np.array([r.accuracy for r in trial_results], dtype=np.float64)
+        
+        # First trial with the highest accuracy wins; nothing wins if every trial scored 0
         best_weights = None
         best_results = None
+        best_accuracy = 0
+        if len(accuracies):
+            best_idx = int(accuracies.argmax())
+            if accuracies[best_idx] > 0:
+                best_accuracy = trial_results[best_idx].accuracy
+                best_weights = _vec_to_dict(test_combinations[best_idx])
+                best_results = trial_results[best_idx]._asdict()
         
-        # Test different weight combinations
-        # Note: This is simplified - full optimization would test many more combinations
-        test_combinations = self._generate_weight_combinations(weight_options)
-        
-        results_log = []
-        
-        for i, weights in enumerate(test_combinations[:10]):  # Limit to 10 tests for speed
-            logger.info(f"Testing weight combination {i+1}/10")
-            
-            # Update engine with test weights
-            test_engine = self._create_test_engine(weights)
-            
-            # Run backtest with these weights
-            backtest_results = self._run_test_backtest(test_engine)
-            
-            if backtest_results and backtest_results.get('accuracy', 0) > best_accuracy:
-                best_accuracy = backtest_results['accuracy']
-                best_weights = weights
-                best_results = backtest_results
-            
-            results_log.append({
-                'weights': weights,
-                'accuracy': backtest_results.get('accuracy', 0),
-                'total_games': backtest_results.get('completed_games', 0)
-            })
+        results_log = [
+            {
+                'weights': _vec_to_dict(weight_vec),
+                'accuracy': accuracy,
+                'total_games': backtest_results.completed_games
+            }
+            for weight_vec, accuracy, backtest_results
+            in zip(test_combinations, accuracies.tolist(), trial_results)
+        ]
         
         return {
             'best_weights': best_weights,
@@ -72,133 +93,140 @@ class AlgorithmOptimizer:
             'optimization_date': datetime.now().isoformat()
         }
     
-    def _generate_weight_combinations(self, weight_options: Dict) -> List[Dict]:
-        """Generate valid weight combinations that sum to 1.0"""
-        combinations = []
-        
-        # Simple approach: test a few reasonable combinations
-        # Full optimization would use more sophisticated methods
-        
-        combinations.extend([
-            # Balanced approach
-            {
-                'team_strength': 0.35,
-                'head_to_head': 0.20,
-                'home_advantage': 0.15,
-                'rest_advantage': 0.10,
-                'weather_impact': 0.10,
-                'motivation': 0.05,
-                'injuries': 0.05
-            },
-            # Heavy team strength focus
-            {
-                'team_strength': 0.45,
-                'head_to_head': 0.15,
-                'home_advantage': 0.15,
-                'rest_advantage': 0.10,
-                'weather_impact': 0.08,
-                'motivation': 0.04,
-                'injuries': 0.03
-            },
-            # Historical focus
-            {
-                'team_strength': 0.30,
-                'head_to_head': 0.30,
-                'home_advantage': 0.15,
-                'rest_advantage': 0.10,
-                'weather_impact': 0.08,
-                'motivation': 0.04,
-                'injuries': 0.03
-            }
-        ])
+    def _weight_grid(self, weight_options: Dict) -> np.ndarray:
+        """Build the valid weight combinations as an (N, n_factors) matrix in FACTOR_NAMES order"""
+        # Full Cartesian product of the options
+        grid = np.stack(
+            np.meshgrid(*(np.asarray(weight_options[name], dtype=float) for name in FACTOR_NAMES), indexing='ij'),
+            axis=-1
+        ).reshape(-1, len(FACTOR_NAMES))
         
-        return combinations
+        # Keep only rows whose weights sum to 1.0
+        return grid[np.isclose(grid.sum(axis=1), 1.0)]
     
     def _create_test_engine(self, weights: Dict) -> AdvancedPredictionEngine:
         """Create prediction engine with test weights"""
         engine = AdvancedPredictionEngine()
+        if self.offline:
+            engine.data_manager.set_offline()
         engine.factor_weights = weights
         return engine
     
-    def _run_test_backtest(self, engine: AdvancedPredictionEngine) -> Dict:
-        """Run simplified backtest for optimization"""
-        try:
+    def _get_cached_eval_set(self) -> Tuple[List[Dict], List[str]]:
+        """Get the sample of historical games and their actual winners, loading it once"""
+        if self._cached_games is None:
             # Get a sample of historical games for quick testing
-            historical_games = self.backtester._get_historical_games()[:50]  # Test on 50 games
-            
-            if not historical_games:
-                return {'accuracy': 0, 'completed_games': 0}
+            self._cached_games = self.backtester._get_historical_games()[:50]  # Test on 50 games
+            self._cached_actuals = [
+                self.backtester._get_actual_winner(game) for game in self._cached_games
+            ]
+        
+        return self._cached_games, self._cached_actuals
+    
+    def _build_factor_matrix(self):
+        """Precompute each game's confidence-scaled factor values as an (N, n_factors) matrix
+        
+        A prediction's spread is sum(value * weight * confidence) / sum(weight * confidence),
+        and only its sign picks the winner, so for any weight vector w the home team is
+        predicted exactly when (factor_matrix @ w) > 0.
+        """
+        historical_games, actual_winners = self._get_cached_eval_set()
+        
+        scored_games = []
+        home_won = []
+        away_won = []
+        
+        for game, actual_winner in zip(historical_games, actual_winners):
+            prediction = self.backtester._predict_historical_game(game)
+            if not prediction:
+                continue
             
-            correct = 0
-            total = 0
+            scored_games.append((game, prediction.factors, PredictionBatch.factor_row(prediction.factors)))
+            home_won.append(actual_winner == game['home_team_name'])
+            away_won.append(actual_winner == game['away_team_name'])
+        
+        # Factors are produced in FACTOR_NAMES order; zero-confidence factors are ignored
+        batch = PredictionBatch.from_scored_games(scored_games)
+        factor_matrix = np.where(batch.confidences > 0, batch.values * batch.confidences, 0.0)
+        self._factor_matrix = factor_matrix.reshape(len(scored_games), len(FACTOR_NAMES))
+        self._home_won = np.array(home_won, dtype=bool)
+        self._away_won = np.array(away_won, dtype=bool)
+    
+    def refresh_cache(self):
+        """Drop the cached evaluation set so the next trial reloads it"""
+        self._cached_games = None
+        self._cached_actuals = None
+        self._factor_matrix = None
+    
+    def _run_test_backtest(self, engine: AdvancedPredictionEngine) -> BacktestResult:
+        """Run simplified backtest for optimization"""
+        return self._evaluate_weights(engine.weight_vector)
+    
+    def _evaluate_weights(self, weights: np.ndarray) -> BacktestResult:
+        """Backtest a weight vector (FACTOR_NAMES order) against the evaluation set"""
+        return self._evaluate_weight_matrix(weights[np.newaxis, :])[0]
+    
+    def _evaluate_weight_matrix(self, weight_matrix: np.ndarray) -> List[BacktestResult]:
+        """Backtest each row of a (T, n_factors) weight matrix against the evaluation set"""
+        try:
+            if self._factor_matrix is None:
+                self._build_factor_matrix()
             
-            for game in historical_games:
-                if not self.backtester._is_game_completed(game):
-                    continue
-                
-                prediction = self.backtester._predict_historical_game(game)
-                if not prediction:
-                    continue
-                
-                actual_winner = self.backtester._get_actual_winner(game)
-                
-                if prediction.predicted_winner == actual_winner:
-                    correct += 1
-                total += 1
+            total = len(self._factor_matrix)
+            if total == 0:
+                return [EMPTY_BACKTEST] * len(weight_matrix)
             
-            accuracy = correct / total if total > 0 else 0
+            # Score every game under every weight vector in one matmul: (N, T)
+            home_predicted = self._factor_matrix @ weight_matrix.T > 0
+            correct_counts = np.where(
+                home_predicted, self._home_won[:, np.newaxis], self._away_won[:, np.newaxis]
+            ).sum(axis=0)
             
-            return {
-                'accuracy': accuracy,
-                'completed_games': total,
-                'correct_predictions': correct
-            }
+            return [
+                BacktestResult(correct / total, total, correct)
+                for correct in correct_counts.tolist()
+            ]
             
         except Exception as e:
             logger.error(f"Error in test backtest: {e}")
-            return {'accuracy': 0, 'completed_games': 0}
+            return [EMPTY_BACKTEST] * len(weight_matrix)
     
     def analyze_factor_importance(self) -> Dict:
         """Analyze which factors are most important for predictions"""
         logger.info("Analyzing factor importance")
         
-        # Run backtest with current settings
-        baseline_results = self.backtester.run_backtest()
+        # Baseline weights plus one leave-one-out vector per factor
+        base_weights = self.base_engine.weight_vector
+        total_weight = base_weights.sum()
         
-        if not baseline_results or baseline_results.get('completed_games', 0) == 0:
+        # Row i drops factor i and redistributes its weight proportionally
+        removal_weights = base_weights * ~np.eye(len(FACTOR_NAMES), dtype=bool)
+        remaining = removal_weights.sum(axis=1, keepdims=True)
+        has_remaining = remaining > 0
+        removal_weights *= np.divide(total_weight, remaining, out=np.ones_like(remaining), where=has_remaining)
+        
+        # Backtest the baseline and every removal against the same games in one pass
+        baseline_results, *removal_results = self._evaluate_weight_matrix(
+            np.vstack([base_weights, removal_weights])
+        )
+        
+        if baseline_results.completed_games == 0:
             return {'error': 'No historical data available for analysis'}
         
-        # Test removing each factor individually
         factor_analysis = {}
         
-        for factor_name in self.base_engine.factor_weights.keys():
-            logger.info(f"Testing impact of removing {factor_name}")
-            
-            # Create engine without this factor
-            test_weights = self.base_engine.factor_weights.copy()
-            removed_weight = test_weights.pop(factor_name)
-            
-            # Redistribute the weight proportionally
-            total_remaining = sum(test_weights.values())
-            if total_remaining > 0:
-                for key in test_weights:
-                    test_weights[key] += (removed_weight * test_weights[key] / total_remaining)
-            
-            # Test performance without this factor
-            test_engine = self._create_test_engine(test_weights)
-            test_results = self._run_test_backtest(test_engine)
-            
-            accuracy_drop = baseline_results['accuracy'] - test_results.get('accuracy', 0)
+        for factor_name, test_results in zip(FACTOR_NAMES, removal_results):
+            accuracy_drop = baseline_results.accuracy - test_results.accuracy
             
             factor_analysis[factor_name] = {
-                'baseline_accuracy': baseline_results['accuracy'],
-                'without_factor_accuracy': test_results.get('accuracy', 0),
+                'baseline_accuracy': baseline_results.accuracy,
+                'without_factor_accuracy': test_results.accuracy,
                 'accuracy_drop': accuracy_drop,
                 'importance_score': accuracy_drop * 100  # Convert to percentage points
             }
         
         return {
-            'baseline_accuracy': baseline_results['accuracy'],
+            'baseline_accuracy': baseline_results.accuracy,
             'factor_importance': factor_analysis,
             'analysis_date': datetime.now().isoformat()
         }
@@ -3,17 +3,44 @@ Advanced Prediction Engine
 Multi-factor NFL game prediction system
 """
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from collections import defaultdict
 import logging
 import json
+import functools
+import operator
+import numpy as np
+import orjson
 from dataclasses import dataclass
 from .data_manager import DataManager
 from ..models.database import SportsDatabase
-from config.data_sources import NFL_STADIUMS
+from config.data_sources import STADIUM_INDEX
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Most recent games searched for head-to-head matchups
+MATCHUP_HISTORY_GAMES = 100
+
+# Row fields read for every historical game, fetched in one C-level call
+_get_matchup_teams = operator.itemgetter('home_team_id', 'away_team_id')
+_get_matchup_fields = operator.itemgetter('home_team_id', 'away_team_id', 'home_score', 'away_score')
+
+# Fixed factor order for predictions, weight vectors and the optimizer
+FACTOR_NAMES = (
+    'team_strength',
+    'head_to_head',
+    'home_advantage',
+    'rest_advantage',
+    'weather_impact',
+    'motivation',
+    'injuries'
+)
+FACTOR_IDX = {name: i for i, name in enumerate(FACTOR_NAMES)}
+(TEAM_STRENGTH, HEAD_TO_HEAD, HOME_ADVANTAGE, REST_ADVANTAGE,
+ WEATHER_IMPACT, MOTIVATION, INJURIES) = range(len(FACTOR_NAMES))
+
+@dataclass(slots=True, frozen=True)
 class PredictionFactor:
     name: str
     value: float  # -100 to +100 (negative favors away, positive favors home)
@@ -21,7 +48,7 @@ class PredictionFactor:
     confidence: float  # 0.0 to 1.0 (data quality)
     explanation: str
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GamePrediction:
     game_id: str
     home_team: str
@@ -30,9 +57,83 @@ class GamePrediction:
     confidence: float
     spread_prediction: float
     total_prediction: Optional[float]
-    factors: List[PredictionFactor]
+    factors: Tuple[PredictionFactor, ...]
     algorithm_version: str
     created_at: str
+    
+    @property
+    def factors_json(self) -> str:
+        """Factors serialized for database saves (built on demand, so unsaved predictions skip it)"""
+        return orjson.dumps(self.factors, default=str).decode()
+
+@functools.lru_cache(maxsize=64)
+def _home_advantage(home_team_id: str) -> Tuple[float, float, str]:
+    """Home field advantage (value, confidence, explanation) for a team's stadium"""
+    stadium_info = STADIUM_INDEX.get(home_team_id)
+    
+    # Base home advantage
+    base_advantage = 2.5  # NFL average
+    
+    # Adjust for specific factors
+    if stadium_info is not None and stadium_info.dome:
+        base_advantage += 0.5  # Dome advantage (controlled conditions)
+    
+    # Could add more factors: altitude, crowd noise, etc.
+    
+    return base_advantage, 0.9, f"Standard home advantage: {base_advantage:.1f} points"
+
+def _weighted_spreads(values: np.ndarray, weights: np.ndarray, confidences: np.ndarray) -> np.ndarray:
+    """Confidence-weighted average factor value per game (rows are games, columns are factors)
+    
+    Factors with zero confidence are ignored; games with no usable factors get a spread of 0.
+    """
+    used = confidences > 0
+    total_weighted_value = np.where(used, values * weights * confidences, 0.0).sum(axis=1)
+    total_weight = np.where(used, weights * confidences, 0.0).sum(axis=1)
+    
+    return np.divide(
+        total_weighted_value, total_weight,
+        out=np.zeros_like(total_weight), where=total_weight > 0
+    )
+
+@dataclass
+class PredictionBatch:
+    """Prediction factors for a slate of games as (games, factors) arrays"""
+    games: List[Dict]
+    factors: List[List[PredictionFactor]]
+    values: np.ndarray
+    weights: np.ndarray
+    confidences: np.ndarray
+    
+    @staticmethod
+    def factor_row(factors: List[PredictionFactor]) -> np.ndarray:
+        """One game's (factors, 3) value/weight/confidence row, raising if a factor isn't numeric"""
+        if len(factors) != len(FACTOR_NAMES):
+            raise ValueError(f"expected {len(FACTOR_NAMES)} factors, got {len(factors)}")
+        
+        return np.array(
+            [(float(f.value), float(f.weight), float(f.confidence)) for f in factors],
+            dtype=np.float64
+        )
+    
+    @classmethod
+    def from_scored_games(cls, scored_games: List[Tuple[Dict, List[PredictionFactor], np.ndarray]]) -> 'PredictionBatch':
+        """Lay out (game, factors, row) triples as contiguous value/weight/confidence columns"""
+        games = [game for game, _, _ in scored_games]
+        factors = [game_factors for _, game_factors, _ in scored_games]
+        table = np.stack([row for _, _, row in scored_games]) if scored_games else np.empty((0, 0, 3))
+        
+        return cls(
+            games=games,
+            factors=factors,
+            values=np.ascontiguousarray(table[..., 0]),
+            weights=np.ascontiguousarray(table[..., 1]),
+            confidences=np.ascontiguousarray(table[..., 2])
+        )
+    
+    def spreads(self) -> np.ndarray:
+        """Predicted point spread for every game (positive favors home)"""
+        return _weighted_spreads(self.values, self.weights, self.confidences)
 
 class AdvancedPredictionEngine:
     """Advanced multi-factor prediction engine"""
@@ -53,8 +154,28 @@ class AdvancedPredictionEngine:
             'injuries': 0.05           # Key player availability (placeholder)
         }
         
+        # Recent games keyed by frozenset of team ids, only set while predicting a slate
+        self._matchup_index = None
+        
         logger.info(f"Initialized Prediction Engine v{self.version}")
     
+    @property
+    def factor_weights(self) -> Mapping[str, float]:
+        """Read-only factor weights by name (assign a new dict to retune the engine)"""
+        return self._factor_weights
+    
+    @factor_weights.setter
+    def factor_weights(self, weights: Mapping[str, float]):
+        self._factor_weights = MappingProxyType(dict(weights))
+        
+        # Positional copies in FACTOR_NAMES order (missing factors weigh 0)
+        self._weights = tuple(float(weights.get(name, 0)) for name in FACTOR_NAMES)
+        self.weight_vector = np.array(self._weights)
+        self.weight_vector.flags.writeable = False
+        
+        # Factors that don't depend on the game are rebuilt for the new weights
+        self._placeholder_cache = None
+    
     def predict_games(self, games_data: List[Dict] = None) -> List[GamePrediction]:
         """Generate predictions for multiple games"""
         if not games_data:
@@ -62,15 +183,29 @@ class AdvancedPredictionEngine:
             prediction_data = self.data_manager.get_prediction_data()
             games_data = prediction_data.get('games', [])
         
-        predictions = []
+        # Only upcoming games are predicted
+        upcoming_games = [game for game in games_data if game.get('status') == 'STATUS_SCHEDULED']
+        scored_games = []
         
-        for game in games_data:
-            try:
-                prediction = self._predict_single_game(game)
-                if prediction:
-                    predictions.append(prediction)
-            except Exception as e:
-                logger.error(f"Failed to predict game {game.get('espn_id')}: {e}")
+        # Fetch recent games once and share them across every head-to-head lookup in the slate
+        self._matchup_index = self._build_matchup_index()
+        try:
+            for game in upcoming_games:
+                try:
+                    factors = self._collect_factors(game)
+                    
+                    # Coerce and check here so one bad game can't sink the batched pass below
+                    row = PredictionBatch.factor_row(factors)
+                    if 'espn_id' not in game or 'name' not in game['home_team'] or 'name' not in game['away_team']:
+                        raise KeyError("game is missing its espn_id or a team name")
+                    scored_games.append((game, factors, row))
+                except Exception as e:
+                    logger.error(f"Failed to predict game {game.get('espn_id')}: {e}")
+        finally:
+            self._matchup_index = None
+        
+        # Reduce every game's factors to a prediction in one vectorized pass
+        predictions = self._build_predictions(PredictionBatch.from_scored_games(scored_games))
         
         logger.info(f"Generated {len(predictions)} game predictions")
         return predictions
@@ -80,35 +215,67 @@ class AdvancedPredictionEngine:
         if game.get('status') != 'STATUS_SCHEDULED':
             return None  # Only predict upcoming games
         
+        factors = self._collect_factors(game)
+        scored_game = (game, factors, PredictionBatch.factor_row(factors))
+        return self._build_predictions(PredictionBatch.from_scored_games([scored_game]))[0]
+    
+    def _collect_factors(self, game: Dict) -> List[PredictionFactor]:
+        """Calculate every prediction factor for an upcoming game (callers filter by status)"""
         home_team = game['home_team']
         away_team = game['away_team']
+        rest_factor, motivation_factor, injury_factor = self._placeholder_factors()
         
         # Collect all prediction factors
-        factors = [
+        return [
             self._calculate_team_strength_factor(home_team, away_team),
             self._calculate_head_to_head_factor(home_team['id'], away_team['id']),
             self._calculate_home_advantage_factor(home_team['id']),
-            self._calculate_rest_factor(game),
+            rest_factor,
             self._calculate_weather_factor(game),
-            self._calculate_motivation_factor(game),
-            self._calculate_injury_factor(home_team['id'], away_team['id'])
+            motivation_factor,
+            injury_factor
         ]
+    
+    def _placeholder_factors(self) -> Tuple[PredictionFactor, PredictionFactor, PredictionFactor]:
+        """Rest, motivation and injury factors, which don't use game data yet (built once per weights)"""
+        if self._placeholder_cache is None:
+            self._placeholder_cache = (
+                self._calculate_rest_factor({}),
+                self._calculate_motivation_factor({}),
+                self._calculate_injury_factor(None, None)
+            )
         
-        # Calculate weighted prediction
-        prediction_result = self._calculate_final_prediction(factors, home_team, away_team)
+        return self._placeholder_cache
+    
+    def _build_predictions(self, batch: PredictionBatch) -> List[GamePrediction]:
+        """Turn a batch of scored games into predictions, reducing all games' factors at once"""
+        if not batch.games:
+            return []
         
-        return GamePrediction(
-            game_id=game['espn_id'],
-            home_team=home_team['name'],
-            away_team=away_team['name'],
-            predicted_winner=prediction_result['winner'],
-            confidence=prediction_result['confidence'],
-            spread_prediction=prediction_result['spread'],
-            total_prediction=prediction_result.get('total'),
-            factors=factors,
-            algorithm_version=self.version,
-            created_at=datetime.now().isoformat()
-        )
+        spreads = batch.spreads()
+        confidences = np.minimum(85, np.abs(spreads) * 8 + 50)  # 50-85% range
+        created_at = datetime.now().isoformat()  # One timestamp for the whole slate
+        
+        predictions = []
+        for game, factors, spread, confidence in zip(batch.games, batch.factors,
+                                                     spreads.tolist(), confidences.tolist()):
+            home_team = game['home_team']
+            away_team = game['away_team']
+            
+            predictions.append(GamePrediction(
+                game_id=game['espn_id'],
+                home_team=home_team['name'],
+                away_team=away_team['name'],
+                predicted_winner=home_team['name'] if spread > 0 else away_team['name'],
+                confidence=round(confidence, 1),
+                spread_prediction=round(spread, 1),
+                total_prediction=None,  # Not implemented yet
+                factors=tuple(factors),
+                algorithm_version=self.version,
+                created_at=created_at
+            ))
+        
+        return predictions
     
     def _calculate_team_strength_factor(self, home_team: Dict, away_team: Dict) -> PredictionFactor:
         """Calculate team strength differential"""
@@ -124,7 +291,7 @@ class AdvancedPredictionEngine:
                 return PredictionFactor(
                     name="Team Strength",
                     value=0,
-                    weight=self.factor_weights['team_strength'],
+                    weight=self._weights[TEAM_STRENGTH],
                     confidence=0.1,
                     explanation="Insufficient season data"
                 )
@@ -138,7 +305,7 @@ class AdvancedPredictionEngine:
             return PredictionFactor(
                 name="Team Strength",
                 value=strength_diff,
-                weight=self.factor_weights['team_strength'],
+                weight=self._weights[TEAM_STRENGTH],
                 confidence=min(0.9, (home_games + away_games) / 20),  # Higher confidence with more games
                 explanation=f"Home: {home_win_pct:.1%} ({home_record['wins']}-{home_record['losses']}) vs Away: {away_win_pct:.1%} ({away_record['wins']}-{away_record['losses']})"
             )
@@ -157,7 +324,7 @@ class AdvancedPredictionEngine:
                 return PredictionFactor(
                     name="Head-to-Head",
                     value=0,
-                    weight=self.factor_weights['head_to_head'],
+                    weight=self._weights[HEAD_TO_HEAD],
                     confidence=0.2,
                     explanation="Limited historical data"
                 )
@@ -167,24 +334,24 @@ class AdvancedPredictionEngine:
             home_wins = 0
             total_point_diff = 0
             
-            for game in recent_games:
-                if game['home_team_id'] == home_team_id:
+            for h_id, a_id, h_s, a_s in map(_get_matchup_fields, recent_games):
+                if h_id == home_team_id:
                     # Current home team was home
-                    if game['home_score'] > game['away_score']:
+                    if h_s > a_s:
                         home_wins += 1
-                    total_point_diff += (game['home_score'] - game['away_score'])
+                    total_point_diff += (h_s - a_s)
                 else:
                     # Current home team was away
-                    if game['away_score'] > game['home_score']:
+                    if a_s > h_s:
                         home_wins += 1
-                    total_point_diff += (game['away_score'] - game['home_score'])
+                    total_point_diff += (a_s - h_s)
             
             avg_point_diff = total_point_diff / len(recent_games)
             
             return PredictionFactor(
                 name="Head-to-Head",
                 value=avg_point_diff,
-                weight=self.factor_weights['head_to_head'],
+                weight=self._weights[HEAD_TO_HEAD],
                 confidence=min(0.8, len(recent_games) / 5),
                 explanation=f"Last {len(recent_games)} games: avg margin {avg_point_diff:+.1f} points"
             )
@@ -196,28 +363,20 @@ class AdvancedPredictionEngine:
     def _calculate_home_advantage_factor(self, home_team_id: str) -> PredictionFactor:
         """Calculate home field advantage"""
         try:
-            stadium_info = NFL_STADIUMS.get(home_team_id, {})
-            
-            # Base home advantage
-            base_advantage = 2.5  # NFL average
-            
-            # Adjust for specific factors
-            if stadium_info.get('dome', False):
-                base_advantage += 0.5  # Dome advantage (controlled conditions)
-            
-            # Could add more factors: altitude, crowd noise, etc.
+            # Depends only on the stadium, so it is computed once per team
+            value, confidence, explanation = _home_advantage(home_team_id)
             
             return PredictionFactor(
                 name="Home Advantage",
-                value=base_advantage,
-                weight=self.factor_weights['home_advantage'],
-                confidence=0.9,
-                explanation=f"Standard home advantage: {base_advantage:.1f} points"
+                value=value,
+                weight=self._weights[HOME_ADVANTAGE],
+                confidence=confidence,
+                explanation=explanation
             )
             
         except Exception as e:
             logger.warning(f"Error calculating home advantage: {e}")
-            return PredictionFactor("Home Advantage", 2.5, self.factor_weights['home_advantage'], 0.8, "Standard advantage")
+            return PredictionFactor("Home Advantage", 2.5, self._weights[HOME_ADVANTAGE], 0.8, "Standard advantage")
     
     def _calculate_rest_factor(self, game: Dict) -> PredictionFactor:
         """Calculate rest advantage"""
@@ -227,7 +386,7 @@ class AdvancedPredictionEngine:
             return PredictionFactor(
                 name="Rest Advantage",
                 value=0,
-                weight=self.factor_weights['rest_advantage'],
+                weight=self._weights[REST_ADVANTAGE],
                 confidence=0.1,
                 explanation="Rest data not implemented"
             )
@@ -244,7 +403,7 @@ class AdvancedPredictionEngine:
                 return PredictionFactor(
                     name="Weather",
                     value=0,
-                    weight=self.factor_weights['weather_impact'],
+                    weight=self._weights[WEATHER_IMPACT],
                     confidence=0.9,
                     explanation="Indoor game - no weather impact"
                 )
@@ -253,7 +412,7 @@ class AdvancedPredictionEngine:
                 return PredictionFactor(
                     name="Weather",
                     value=0,
-                    weight=self.factor_weights['weather_impact'],
+                    weight=self._weights[WEATHER_IMPACT],
                     confidence=0.1,
                     explanation="Weather data unavailable"
                 )
@@ -265,7 +424,7 @@ class AdvancedPredictionEngine:
             return PredictionFactor(
                 name="Weather",
                 value=total_impact,
-                weight=self.factor_weights['weather_impact'],
+                weight=self._weights[WEATHER_IMPACT],
                 confidence=0.7,
                 explanation=f"Weather impact: {total_impact:+.1f} points ({weather.get('conditions', 'unknown')})"
             )
@@ -283,7 +442,7 @@ class AdvancedPredictionEngine:
             return PredictionFactor(
                 name="Motivation",
                 value=0,
-                weight=self.factor_weights['motivation'],
+                weight=self._weights[MOTIVATION],
                 confidence=0.2,
                 explanation="Motivation factors not implemented"
             )
@@ -300,7 +459,7 @@ class AdvancedPredictionEngine:
             return PredictionFactor(
                 name="Injuries",
                 value=0,
-                weight=self.factor_weights['injuries'],
+                weight=self._weights[INJURIES],
                 confidence=0.1,
                 explanation="Injury analysis not implemented"
             )
@@ -308,87 +467,55 @@ class AdvancedPredictionEngine:
         except Exception as e:
             return PredictionFactor("Injuries", 0, 0, 0, "Injury data unavailable")
     
-    def _calculate_final_prediction(self, factors: List[PredictionFactor], 
-                                  home_team: Dict, away_team: Dict) -> Dict:
-        """Calculate final prediction from all factors"""
-        total_weighted_value = 0
-        total_weight = 0
+    def _build_matchup_index(self) -> Dict[frozenset, List[Dict]]:
+        """Group recent games by the pair of teams that played (newest first within each pair)"""
+        index = defaultdict(list)
         
-        # Calculate weighted average of all factors
-        for factor in factors:
-            if factor.confidence > 0:
-                weighted_value = factor.value * factor.weight * factor.confidence
-                total_weighted_value += weighted_value
-                total_weight += factor.weight * factor.confidence
-        
-        # Normalize to get final point spread
-        if total_weight > 0:
-            predicted_spread = total_weighted_value / total_weight
-        else:
-            predicted_spread = 0
-        
-        # Determine winner and confidence
-        if predicted_spread > 0:
-            winner = home_team['name']
-            confidence = min(85, abs(predicted_spread) * 8 + 50)  # 50-85% range
-        else:
-            winner = away_team['name']
-            confidence = min(85, abs(predicted_spread) * 8 + 50)
+        try:
+            for game in self.database.get_games(limit=MATCHUP_HISTORY_GAMES, parse_json=False):
+                index[frozenset(_get_matchup_teams(game))].append(game)
+        except Exception as e:
+            logger.error(f"Error getting historical matchups: {e}")
         
-        return {
-            'winner': winner,
-            'confidence': round(confidence, 1),
-            'spread': round(predicted_spread, 1),
-            'total': None  # Not implemented yet
-        }
+        return index
     
     def _get_historical_matchups(self, team1_id: str, team2_id: str) -> List[Dict]:
         """Get historical games between two teams"""
+        if self._matchup_index is not None:
+            return self._matchup_index.get(frozenset((team1_id, team2_id)), [])
+        
         try:
-            games = self.database.get_games(limit=100)  # Get recent games
-            
-            # Filter for matchups between these teams
-            matchups = []
-            for game in games:
-                if ((game['home_team_id'] == team1_id and game['away_team_id'] == team2_id) or
-                    (game['home_team_id'] == team2_id and game['away_team_id'] == team1_id)):
-                    matchups.append(game)
-            
-            return matchups
-            
+            return self.database.get_matchups(team1_id, team2_id, recent_games=MATCHUP_HISTORY_GAMES)
         except Exception as e:
             logger.error(f"Error getting historical matchups: {e}")
             return []
     
     def save_predictions(self, predictions: List[GamePrediction]) -> int:
         """Save predictions to database"""
-        saved_count = 0
+        prediction_rows = []
         
+        # Build every row first so one bad prediction doesn't sink the batch
         for prediction in predictions:
             try:
-                prediction_data = {
+                prediction_rows.append({
                     'game_id': prediction.game_id,
                     'predicted_winner': prediction.predicted_winner,
                     'confidence': prediction.confidence,
                     'prediction_type': 'spread',
-                    'factors': [
-                        {
-                            'name': f.name,
-                            'value': f.value,
-                            'weight': f.weight,
-                            'confidence': f.confidence,
-                            'explanation': f.explanation
-                        }
-                        for f in prediction.factors
-                    ]
-                }
-                
-                self.database.save_prediction(prediction_data)
-                saved_count += 1
+                    'factors_json': prediction.factors_json
+                })
                 
             except Exception as e:
                 logger.error(f"Error saving prediction for game {prediction.game_id}: {e}")
         
+        saved_count = 0
+        if prediction_rows:
+            try:
+                # One executemany in a single transaction
+                saved_count = self.database.save_predictions(prediction_rows)
+            except Exception as e:
+                logger.error(f"Error saving {len(prediction_rows)} predictions: {e}")
+        
         logger.info(f"Saved {saved_count} predictions to database")
         return saved_count
     
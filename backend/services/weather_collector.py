@@ -2,26 +2,111 @@
 Weather Data Collector
 Collects weather data for outdoor NFL games
 """
+import copy
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import functools
 import logging
+import requests
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from .base_collector import BaseDataCollector
-from config.data_sources import WEATHER_CONFIG, NFL_STADIUMS
+from config.data_sources import WEATHER_CONFIG, NFL_STADIUMS, STADIUM_INDEX
 from config.api_keys import api_keys
 
 logger = logging.getLogger(__name__)
 
+# Maximum concurrent lookups when collecting weather for a slate of games
+WEATHER_WORKERS = 10
+
+# Conditions that count as precipitation for game impact
+PRECIPITATION_CONDITIONS = frozenset({'Rain', 'Snow', 'Thunderstorm'})
+
+@functools.lru_cache(maxsize=32)
+def _impact_for_bands(temp_band: int, wind_band: int, precipitation: bool) -> Tuple[int, int, int, str]:
+    """Score impact (total, passing, kicking, rating) for a temperature band (0 freezing,
+    1 mild, 2 very hot), wind band (0 calm, 1 moderate, 2 strong) and precipitation flag"""
+    total = passing = kicking = 0
+    
+    # Temperature impact
+    if temp_band == 0:  # Freezing
+        total -= 3
+        passing -= 2
+        kicking -= 2
+    elif temp_band == 2:  # Very hot
+        total -= 1
+        passing -= 1
+    
+    # Wind impact
+    if wind_band == 2:  # Strong wind
+        total -= 4
+        passing -= 3
+        kicking -= 4
+    elif wind_band == 1:  # Moderate wind
+        total -= 2
+        passing -= 1
+        kicking -= 2
+    
+    # Precipitation impact
+    if precipitation:
+        total -= 3
+        passing -= 2
+        kicking -= 1
+    
+    # Overall rating
+    if abs(total) >= 5:
+        rating = 'severe'
+    elif abs(total) >= 3:
+        rating = 'moderate'
+    elif abs(total) >= 1:
+        rating = 'mild'
+    else:
+        rating = 'neutral'
+    
+    return total, passing, kicking, rating
+
+# Every band combination's impact, indexed [temp_band, wind_band, precipitation]
+_IMPACT_TABLE = np.array([
+    [[_impact_for_bands(t, w, p)[:3] for p in (False, True)] for w in range(3)]
+    for t in range(3)
+])
+_RATING_TABLE = np.array([
+    [[_impact_for_bands(t, w, p)[3] for p in (False, True)] for w in range(3)]
+    for t in range(3)
+])
+
+def compute_impacts(temps: np.ndarray, wind_speeds: np.ndarray,
+                    precipitation: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Weather impact for many readings at once
+    
+    Returns an (N, 3) array of (total, passing, kicking) impacts and an (N,) array of ratings.
+    """
+    temps = np.asarray(temps, dtype=float)
+    wind_speeds = np.asarray(wind_speeds, dtype=float)
+    
+    temp_band = np.where(temps < 32, 0, np.where(temps > 90, 2, 1))
+    wind_band = np.where(wind_speeds > 20, 2, np.where(wind_speeds > 15, 1, 0))
+    wet = np.asarray(precipitation, dtype=int)
+    
+    return _IMPACT_TABLE[temp_band, wind_band, wet], _RATING_TABLE[temp_band, wind_band, wet]
+
 class WeatherCollector(BaseDataCollector):
     """Weather API data collector"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         super().__init__(
             name="Weather",
             base_url=WEATHER_CONFIG['base_url'],
-            rate_limit=WEATHER_CONFIG['rate_limit']['requests_per_minute']
+            rate_limit=WEATHER_CONFIG['rate_limit']['requests_per_minute'],
+            session=session
         )
         self.api_key = api_keys.WEATHER_API_KEY
         self.stadiums = NFL_STADIUMS
+        
+        # Current-weather results keyed by city: {city: (fetched_at, result)}
+        self._weather_cache = {}
+        self._cache_ttl = WEATHER_CONFIG['cache']['ttl_seconds']
     
     def collect_data(self, data_type: str = 'current', **kwargs) -> Dict:
         """Collect weather data"""
@@ -38,6 +123,9 @@ class WeatherCollector(BaseDataCollector):
             team_id = kwargs.get('team_id')
             game_date = kwargs.get('game_date')
             return self._collect_game_weather(team_id, game_date)
+        elif data_type == 'game_weather_batch':
+            team_ids = kwargs.get('team_ids') or []
+            return self._collect_game_weather_batch(team_ids)
         elif data_type == 'forecast':
             city = kwargs.get('city')
             return self._collect_forecast(city)
@@ -50,6 +138,14 @@ class WeatherCollector(BaseDataCollector):
         if not city:
             return {}
         
+        # Reuse a recent reading for this city without touching the network; callers get
+        # their own copy so they can't alter the cached entry
+        now = time.monotonic()
+        cached = self._weather_cache.get(city)
+        if cached and now - cached[0] < self._cache_ttl:
+            logger.debug(f"Using cached weather for {city}")
+            return copy.deepcopy(cached[1])
+        
         endpoint = WEATHER_CONFIG['endpoints']['current']
         params = {
             'q': city,
@@ -61,29 +157,33 @@ class WeatherCollector(BaseDataCollector):
         if not raw_data:
             return {}
         
+        collected_at = datetime.now().isoformat()
+        
         # Save raw data
-        self.save_raw_data(raw_data, f"weather_{city}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        self.save_raw_data(raw_data, 'weather', key=city, saved_at=collected_at)
         
         # Process weather data
         weather_data = self._process_weather_data(raw_data)
         
-        return {
+        result = {
             'source': 'weather',
             'data_type': 'current',
             'city': city,
-            'collected_at': datetime.now().isoformat(),
+            'collected_at': collected_at,
             'weather': weather_data
         }
+        self._weather_cache[city] = (now, copy.deepcopy(result))
+        
+        return result
     
     def _collect_game_weather(self, team_id: str, game_date: str = None) -> Dict:
         """Collect weather for a specific team's game"""
-        if not team_id or team_id not in self.stadiums:
+        stadium_info = STADIUM_INDEX.get(team_id) if team_id else None
+        if stadium_info is None:
             return {}
         
-        stadium_info = self.stadiums[team_id]
-        
         # Skip if it's a dome
-        if stadium_info.get('dome', True):
+        if stadium_info.dome:
             return {
                 'source': 'weather',
                 'data_type': 'game_weather',
@@ -91,8 +191,15 @@ class WeatherCollector(BaseDataCollector):
                 'weather': {'conditions': 'dome', 'impact': 'none'}
             }
         
-        city = f"{stadium_info['city']},{stadium_info['state']}"
-        return self._collect_current_weather(city)
+        return self._collect_current_weather(stadium_info.location)
+    
+    def _collect_game_weather_batch(self, team_ids: List[str]) -> Dict[str, Dict]:
+        """Collect game weather for many home teams concurrently, keyed by team id"""
+        unique_ids = list(dict.fromkeys(team_ids))
+        
+        # Requests are I/O bound; the rate limiter still bounds overall QPS
+        with ThreadPoolExecutor(max_workers=WEATHER_WORKERS) as pool:
+            return dict(zip(unique_ids, pool.map(self._collect_game_weather, unique_ids)))
     
     def _collect_forecast(self, city: str) -> Dict:
         """Collect weather forecast for a city"""
@@ -110,8 +217,10 @@ class WeatherCollector(BaseDataCollector):
         if not raw_data:
             return {}
         
+        collected_at = datetime.now().isoformat()
+        
         # Save raw data
-        self.save_raw_data(raw_data, f"forecast_{city}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        self.save_raw_data(raw_data, 'forecast', key=city, saved_at=collected_at)
         
         forecast_data = self._process_forecast_data(raw_data)
         
@@ -119,7 +228,7 @@ class WeatherCollector(BaseDataCollector):
             'source': 'weather',
             'data_type': 'forecast',
             'city': city,
-            'collected_at': datetime.now().isoformat(),
+            'collected_at': collected_at,
             'forecast': forecast_data
         }
     
@@ -152,6 +261,7 @@ class WeatherCollector(BaseDataCollector):
     def _process_forecast_data(self, raw_data: Dict) -> List[Dict]:
         """Process forecast data"""
         forecasts = []
+        temps = []
         
         try:
             for item in raw_data['list'][:8]:  # Next 24 hours (3-hour intervals)
@@ -162,57 +272,44 @@ class WeatherCollector(BaseDataCollector):
                     'wind_speed': item.get('wind', {}).get('speed', 0),
                     'precipitation_probability': item.get('pop', 0) * 100
                 }
+                temps.append(item['main']['temp'])
                 forecasts.append(forecast)
         
         except KeyError as e:
             logger.error(f"Error processing forecast data: {e}")
         
+        # Score the game impact of every time step in one pass
+        if forecasts:
+            impacts, ratings = compute_impacts(
+                temps,
+                [f['wind_speed'] for f in forecasts],
+                [f['conditions'] in PRECIPITATION_CONDITIONS for f in forecasts]
+            )
+            for forecast, (total, passing, kicking), rating in zip(forecasts, impacts.tolist(), ratings.tolist()):
+                forecast['game_impact'] = {
+                    'total_score_impact': total,
+                    'passing_impact': passing,
+                    'kicking_impact': kicking,
+                    'overall_rating': rating
+                }
+        
         return forecasts
     
     def _calculate_game_impact(self, temp: float, wind_speed: float, conditions: str) -> Dict:
         """Calculate weather impact on game scoring"""
-        impact = {
-            'total_score_impact': 0,  # Points adjustment for over/under
-            'passing_impact': 0,     # Impact on passing game
-            'kicking_impact': 0,     # Impact on field goals
-            'overall_rating': 'neutral'
-        }
+        # Impact only depends on which temperature/wind band and precipitation class applies
+        temp_band = 0 if temp < 32 else 2 if temp > 90 else 1
+        wind_band = 2 if wind_speed > 20 else 1 if wind_speed > 15 else 0
+        total, passing, kicking, rating = _impact_for_bands(
+            temp_band, wind_band, conditions in PRECIPITATION_CONDITIONS
+        )
         
-        # Temperature impact
-        if temp < 32:  # Freezing
-            impact['total_score_impact'] -= 3
-            impact['passing_impact'] -= 2
-            impact['kicking_impact'] -= 2
-        elif temp > 90:  # Very hot
-            impact['total_score_impact'] -= 1
-            impact['passing_impact'] -= 1
-        
-        # Wind impact
-        if wind_speed > 20:  # Strong wind
-            impact['total_score_impact'] -= 4
-            impact['passing_impact'] -= 3
-            impact['kicking_impact'] -= 4
-        elif wind_speed > 15:  # Moderate wind
-            impact['total_score_impact'] -= 2
-            impact['passing_impact'] -= 1
-            impact['kicking_impact'] -= 2
-        
-        # Precipitation impact
-        if conditions in ['Rain', 'Snow', 'Thunderstorm']:
-            impact['total_score_impact'] -= 3
-            impact['passing_impact'] -= 2
-            impact['kicking_impact'] -= 1
-        
-        # Overall rating
-        total_impact = abs(impact['total_score_impact'])
-        if total_impact >= 5:
-            impact['overall_rating'] = 'severe'
-        elif total_impact >= 3:
-            impact['overall_rating'] = 'moderate'
-        elif total_impact >= 1:
-            impact['overall_rating'] = 'mild'
-        
-        return impact
+        return {
+            'total_score_impact': total,  # Points adjustment for over/under
+            'passing_impact': passing,    # Impact on passing game
+            'kicking_impact': kicking,    # Impact on field goals
+            'overall_rating': rating
+        }
     
     def validate_data(self, data: Dict) -> bool:
         """Validate collected weather data"""
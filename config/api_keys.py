@@ -3,6 +3,7 @@ API Keys Configuration
 Store all API keys and sensitive configuration
 """
 import os
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,6 +13,10 @@ class APIKeys:
     """Centralized API key management"""
     
     def __init__(self):
+        self._load()
+    
+    def _load(self):
+        """Read API keys from the environment and precompute what they enable"""
         # Weather API (OpenWeatherMap)
         self.WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', 'YOUR_API_KEY_HERE')
         
@@ -23,35 +28,33 @@ class APIKeys:
         
         # SportRadar API (Future - Professional)
         self.SPORTRADAR_API_KEY = os.getenv('SPORTRADAR_API_KEY', 'YOUR_API_KEY_HERE')
-    
-    def validate_keys(self):
-        """Check which API keys are configured"""
-        keys_status = {
+        
+        # Keys only change on reload(), so the status is built once here
+        self._key_status = MappingProxyType({
             'weather': self.WEATHER_API_KEY != 'YOUR_API_KEY_HERE',
             'odds': self.ODDS_API_KEY != 'YOUR_API_KEY_HERE',
             'news': self.NEWS_API_KEY != 'YOUR_API_KEY_HERE',
             'sportradar': self.SPORTRADAR_API_KEY != 'YOUR_API_KEY_HERE'
-        }
-        return keys_status
+        })
+        
+        # Configured sources in status order, then the free ones that are always available
+        self._available_sources = tuple(
+            source for source, configured in self._key_status.items() if configured
+        ) + ('espn', 'scraping')
+        self.available_source_set = frozenset(self._available_sources)
+    
+    def reload(self):
+        """Re-read keys from the environment"""
+        load_dotenv(override=True)
+        self._load()
+    
+    def validate_keys(self):
+        """Check which API keys are configured"""
+        return dict(self._key_status)
     
     def get_available_sources(self):
         """Return list of available data sources based on configured keys"""
-        available = []
-        status = self.validate_keys()
-        
-        if status['weather']:
-            available.append('weather')
-        if status['odds']:
-            available.append('odds')
-        if status['news']:
-            available.append('news')
-        if status['sportradar']:
-            available.append('sportradar')
-            
-        # Always available (free APIs)
-        available.extend(['espn', 'scraping'])
-        
-        return available
+        return list(self._available_sources)
 
 # Global instance
 api_keys = APIKeys()
\ No newline at end of file
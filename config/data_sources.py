@@ -2,9 +2,17 @@
 Data Sources Configuration
 Centralized configuration for all data collection sources
 """
+from types import MappingProxyType
+from typing import NamedTuple
+
+def _freeze(value):
+    """Recursively wrap config dicts in read-only mapping views"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
 
 # ESPN API Configuration
-ESPN_CONFIG = {
+ESPN_CONFIG = _freeze({
     'base_url': 'http://site.api.espn.com/apis/site/v2/sports/football/nfl',
     'endpoints': {
         'scoreboard': '/scoreboard',
@@ -16,11 +24,16 @@ ESPN_CONFIG = {
     'rate_limit': {
         'requests_per_minute': 60,
         'requests_per_hour': 3600
+    },
+    'cache': {
+        'ttl_seconds': 300,  # Reuse parsed responses for 5 minutes
+        'disk_path': 'data/cache/espn_responses.db',  # Same TTL, shared across processes
+        'disk_max_entries': 256
     }
-}
+})
 
 # Weather API Configuration (OpenWeatherMap)
-WEATHER_CONFIG = {
+WEATHER_CONFIG = _freeze({
     'base_url': 'http://api.openweathermap.org/data/2.5',
     'endpoints': {
         'current': '/weather',
@@ -29,11 +42,14 @@ WEATHER_CONFIG = {
     'rate_limit': {
         'requests_per_minute': 60,
         'requests_per_day': 1000  # Free tier limit
+    },
+    'cache': {
+        'ttl_seconds': 600  # Weather changes slowly; reuse a city's reading for 10 minutes
     }
-}
+})
 
 # Sports Betting APIs (Future implementation)
-BETTING_APIS = {
+BETTING_APIS = _freeze({
     'the_odds_api': {
         'base_url': 'https://api.the-odds-api.com/v4',
         'endpoints': {
@@ -45,10 +61,10 @@ BETTING_APIS = {
             'requests_per_month': 500  # Free tier
         }
     }
-}
+})
 
 # NFL Team Information
-NFL_TEAMS = {
+_NFL_TEAM_DATA = {
     'AFC_EAST': {
         'bills': {'id': '2', 'city': 'Buffalo', 'name': 'Bills'},
         'dolphins': {'id': '15', 'city': 'Miami', 'name': 'Dolphins'},
@@ -99,8 +115,24 @@ NFL_TEAMS = {
     }
 }
 
+class TeamInfo(NamedTuple):
+    id: str
+    city: str
+    name: str
+    key: str
+    division: str
+
+# Read-only division -> team key -> TeamInfo
+NFL_TEAMS = MappingProxyType({
+    division: MappingProxyType({
+        key: TeamInfo(key=key, division=division, **info)
+        for key, info in teams.items()
+    })
+    for division, teams in _NFL_TEAM_DATA.items()
+})
+
 # Stadium Information (for weather data)
-NFL_STADIUMS = {
+NFL_STADIUMS = _freeze({
     '1': {'city': 'Atlanta', 'state': 'GA', 'dome': True},
     '2': {'city': 'Buffalo', 'state': 'NY', 'dome': False},
     '3': {'city': 'Chicago', 'state': 'IL', 'dome': False},
@@ -133,4 +165,40 @@ NFL_STADIUMS = {
     '30': {'city': 'Jacksonville', 'state': 'FL', 'dome': False},
     '33': {'city': 'Baltimore', 'state': 'MD', 'dome': False},
     '34': {'city': 'Houston', 'state': 'TX', 'dome': True}
-}
\ No newline at end of file
+})
+
+# Team ids whose home stadium is indoor / open-air (only open-air games need weather)
+DOME_STADIUM_IDS = frozenset(team_id for team_id, stadium in NFL_STADIUMS.items() if stadium['dome'])
+OUTDOOR_STADIUM_IDS = frozenset(NFL_STADIUMS) - DOME_STADIUM_IDS
+
+class StadiumInfo(NamedTuple):
+    city: str
+    state: str
+    dome: bool
+    location: str  # "City,ST" query string for weather lookups
+
+# Stadium info per ESPN team id as attribute-access records
+STADIUM_INDEX = {
+    team_id: StadiumInfo(
+        city=stadium['city'],
+        state=stadium['state'],
+        dome=stadium['dome'],
+        location=f"{stadium['city']},{stadium['state']}"
+    )
+    for team_id, stadium in NFL_STADIUMS.items()
+}
+
+# Dense integer index per ESPN team id, for array lookups keyed by team
+TEAM_ID_INDEX = {
+    team.id: idx
+    for idx, team in enumerate(
+        team for division in NFL_TEAMS.values() for team in division.values()
+    )
+}
+
+# Flat team lookup by id, built once from NFL_TEAMS
+TEAMS_BY_ID = {
+    team.id: team
+    for division in NFL_TEAMS.values()
+    for team in division.values()
+}
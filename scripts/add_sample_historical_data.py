@@ -5,75 +5,56 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from backend.models.database import SportsDatabase
+from backend.models.database import SportsDatabase, bulk_insert_games
+from config.data_sources import TEAMS_BY_ID
 import random
 from datetime import datetime, timedelta
 
+# Sample completed games with realistic scores:
+# (espn_id, home_id, away_id, home_score, away_score, days_ago, conditions)
+SAMPLE_GAMES = (
+    ('hist_001', '2', '15', 24, 17, 7, 'clear'),
+    ('hist_002', '12', '7', 31, 14, 6, 'clear'),
+    ('hist_003', '25', '26', 21, 28, 5, 'rain'),
+)
+
 def add_sample_historical_games():
     """Add some sample completed games for testing"""
     db = SportsDatabase()
     
-    # Sample completed games with realistic scores
-    sample_games = [
-        {
-            'espn_id': 'hist_001',
-            'game_date': (datetime.now() - timedelta(days=7)).isoformat(),
-            'home_team_id': '2',
-            'home_team_name': 'Buffalo Bills',
-            'away_team_id': '15',
-            'away_team_name': 'Miami Dolphins',
-            'status': 'STATUS_FINAL',
-            'home_score': 24,
-            'away_score': 17,
-            'weather_data': '{"conditions": "clear"}',
-            'raw_data': '{}'
-        },
-        {
-            'espn_id': 'hist_002',
-            'game_date': (datetime.now() - timedelta(days=6)).isoformat(),
-            'home_team_id': '12',
-            'home_team_name': 'Kansas City Chiefs',
-            'away_team_id': '7',
-            'away_team_name': 'Denver Broncos',
-            'status': 'STATUS_FINAL',
-            'home_score': 31,
-            'away_score': 14,
-            'weather_data': '{"conditions": "clear"}',
-            'raw_data': '{}'
-        },
-        {
-            'espn_id': 'hist_003',
-            'game_date': (datetime.now() - timedelta(days=5)).isoformat(),
-            'home_team_id': '25',
-            'home_team_name': 'San Francisco 49ers',
-            'away_team_id': '26',
-            'away_team_name': 'Seattle Seahawks',
-            'status': 'STATUS_FINAL',
-            'home_score': 21,
-            'away_score': 28,
-            'weather_data': '{"conditions": "rain"}',
-            'raw_data': '{}'
-        }
-    ]
-    
     # Fix: Use sqlite3 directly instead of db.database
     import sqlite3
     
-    with sqlite3.connect(db.db_path) as conn:
-        for game in sample_games:
-            conn.execute('''
-                INSERT OR REPLACE INTO games (
-                    espn_id, game_date, home_team_id, home_team_name,
-                    away_team_id, away_team_name, status, home_score,
-                    away_score, weather_data, raw_data, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                game['espn_id'], game['game_date'], game['home_team_id'], 
-                game['home_team_name'], game['away_team_id'], game['away_team_name'],
-                game['status'], game['home_score'], game['away_score'],
-                game['weather_data'], game['raw_data'],
-                datetime.now().isoformat(), datetime.now().isoformat()
-            ))
-        conn.commit()
+    # One clock read keeps every timestamp in this ingest consistent
+    now = datetime.now()
+    now_iso = now.isoformat()
+    
+    # Rows are generated lazily as the insert consumes them
+    rows = (
+        (
+            espn_id, (now - timedelta(days=days_ago)).isoformat(),
+            home_id, f"{TEAMS_BY_ID[home_id].city} {TEAMS_BY_ID[home_id].name}",
+            away_id, f"{TEAMS_BY_ID[away_id].city} {TEAMS_BY_ID[away_id].name}",
+            'STATUS_FINAL', home_score, away_score,
+            f'{{"conditions": "{conditions}"}}', '{}',
+            now_iso, now_iso
+        )
+        for espn_id, home_id, away_id, home_score, away_score, days_ago, conditions in SAMPLE_GAMES
+    )
+    
+    # One transaction and multi-row INSERT statements for all rows
+    conn = sqlite3.connect(db.db_path, isolation_level=None, cached_statements=256)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('BEGIN')
+        added = bulk_insert_games(conn, rows)
+        conn.execute('COMMIT')
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
     
-    print(f"Added {len(sample_games)} historical games for testing")
\ No newline at end of file
+    print(f"Added {added} historical games for testing")
\ No newline at end of file
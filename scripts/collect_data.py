@@ -4,99 +4,151 @@ Run this script to collect and save all data
 """
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 # Add backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from backend.services.data_manager import DataManager
 from backend.models.database import SportsDatabase
+from config.data_sources import ESPN_CONFIG
 import logging
 
-# Set up logging
+try:
+    import requests_cache
+except ImportError:  # Optional: without it every run goes to the network
+    requests_cache = None
+
+# Set up logging: pipeline output goes through one stdout handler
+# (force replaces the default handler the collectors install on import)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)],
+    force=True
 )
 logger = logging.getLogger(__name__)
 
+# On-disk HTTP cache shared by pipeline runs
+HTTP_CACHE_PATH = 'data/http_cache'
+HTTP_CACHE_EXPIRY = timedelta(hours=1)
+HTTP_CACHE_URL_EXPIRY = {
+    # Team metadata is effectively static within a day
+    ESPN_CONFIG['base_url'].split('://', 1)[1] + ESPN_CONFIG['endpoints']['teams']: timedelta(days=1),
+}
+
+def install_http_cache() -> bool:
+    """Cache GET responses on disk so reruns within the TTL skip HTTP entirely"""
+    if requests_cache is None:
+        logger.info("requests-cache not installed - HTTP responses will not be cached")
+        return False
+    
+    os.makedirs(os.path.dirname(HTTP_CACHE_PATH), exist_ok=True)
+    requests_cache.install_cache(
+        HTTP_CACHE_PATH,
+        backend='sqlite',
+        expire_after=HTTP_CACHE_EXPIRY,
+        urls_expire_after=HTTP_CACHE_URL_EXPIRY,
+        allowable_methods=('GET',),
+        ignored_parameters=['appid']  # Keep the weather API key out of the cache
+    )
+    return True
+
 def run_data_collection():
     """Run complete data collection pipeline"""
-    print("Sports Betting Data Collection Pipeline")
-    print("=" * 60)
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("Sports Betting Data Collection Pipeline - started at %s",
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
     
-    # Initialize components
+    # Initialize components (the cache must be installed before sessions are created)
+    install_http_cache()
     manager = DataManager()
     db = SportsDatabase()
     
     total_saved = 0
+    save_failures = 0
     errors = []
     
+    # Team and game collection are independent network fetches, so overlap them
+    logger.info("Collecting team and game data...")
+    pool = ThreadPoolExecutor(max_workers=2)
+    teams_future = pool.submit(manager.collect_team_data)
+    games_future = pool.submit(manager.collect_game_data, include_weather=True)
+    
     try:
-        # Step 1: Collect team data
-        print("\nStep 1: Collecting team data...")
-        team_data = manager.collect_team_data()
-        
-        if team_data['teams']:
-            teams_saved = db.save_teams(team_data['teams'])
-            total_saved += teams_saved
-            print(f"  ✅ Saved {teams_saved} teams")
-        else:
-            errors.append("No team data collected")
-            print("  ❌ No team data collected")
+        # Wait for both fetches before opening the write transaction
+        team_data = teams_future.result()
+        game_data = games_future.result()
         
-        # Step 2: Collect game data
-        print("\nStep 2: Collecting game data...")
-        game_data = manager.collect_game_data(include_weather=True)
-        
-        if game_data['games']:
-            games_saved = db.save_games(game_data['games'])
-            total_saved += games_saved
-            print(f"  ✅ Saved {games_saved} games")
+        # Steps 1 and 2 are saved in one transaction (a single commit; any failure rolls back both)
+        teams_saved = games_saved = 0
+        with db.transaction():
+            # Step 1: Save team data
+            logger.info("Step 1: Saving team data...")
+            if team_data['teams']:
+                teams_saved = db.save_teams(team_data['teams'])
+                if teams_saved:
+                    logger.info("Saved %d teams", teams_saved)
+                else:
+                    save_failures += 1
+                    errors.append("No teams saved")
+                    logger.error("No teams saved")
+            else:
+                errors.append("No team data collected")
+                logger.error("No team data collected")
+            
+            # Step 2: Save game data
+            logger.info("Step 2: Saving game data...")
+            if game_data['games']:
+                games_saved = db.save_games(game_data['games'])
+                if games_saved:
+                    logger.info("Saved %d games (weather data collected for %d)",
+                                games_saved, game_data['weather_count'])
+                else:
+                    save_failures += 1
+                    errors.append("No games saved")
+                    logger.error("No games saved")
+            else:
+                errors.append("No game data collected")
+                logger.error("No game data collected")
             
-            # Show weather data status
-            weather_count = sum(1 for game in game_data['games'] 
-                              if game.get('weather', {}).get('status') != 'not_needed')
-            print(f"  📊 Weather data collected for {weather_count} games")
-        else:
-            errors.append("No game data collected")
-            print("  ❌ No game data collected")
+            if game_data['errors']:
+                errors.extend(game_data['errors'])
         
-        if game_data['errors']:
-            errors.extend(game_data['errors'])
+        # Only count rows once the transaction has committed
+        total_saved += teams_saved + games_saved
         
         # Step 3: Database stats
-        print("\nStep 3: Database summary...")
+        logger.info("Step 3: Database summary...")
         stats = db.get_database_stats()
-        print(f"  📊 Total games: {stats['games']}")
-        print(f"  📊 Total teams: {stats['teams']}")
-        print(f"  📊 Database size: {stats['database_size']} bytes")
+        logger.info("Total games: %d, total teams: %d, database size: %d bytes",
+                    stats['games'], stats['teams'], stats['database_size'])
         
     except Exception as e:
         errors.append(f"Critical error: {str(e)}")
-        logger.error(f"Critical error in data collection: {e}")
+        logger.error("Critical error in data collection: %s", e)
+    finally:
+        pool.shutdown(wait=True)
     
     # Summary
-    print("\n" + "=" * 60)
-    print("Data Collection Complete")
-    print(f"Total records saved: {total_saved}")
-    print(f"Errors: {len(errors)}")
+    logger.info("Data Collection Complete - total records saved: %d, errors: %d",
+                total_saved, len(errors))
     
     if errors:
-        print("\nErrors encountered:")
-        for error in errors:
-            print(f"  ❌ {error}")
+        logger.error("Errors encountered: %s", errors)
     
-    if total_saved > 0:
-        print("\n✅ Data collection successful - ready for predictions!")
+    success = total_saved > 0 and not save_failures
+    if success:
+        logger.info("Data collection successful - ready for predictions!")
+    elif total_saved > 0:
+        logger.error("Some collected data could not be saved - check the errors above")
     else:
-        print("\n❌ No data collected - check your setup")
+        logger.error("No data collected - check your setup")
     
     return {
         'total_saved': total_saved,
         'errors': errors,
-        'success': total_saved > 0
+        'success': success
     }
 
 if __name__ == "__main__":
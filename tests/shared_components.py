@@ -0,0 +1,40 @@
+"""
+Shared component instances for the test scripts
+Each component is built once per process, so a suite run opens the database,
+checks the schema and sets up collectors once instead of once per test;
+collected prediction data is shared the same way
+"""
+import sys
+import os
+from functools import lru_cache
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.data_manager import DataManager
+from backend.models.database import SportsDatabase
+from backend.services.prediction_engine import AdvancedPredictionEngine
+from backend.services.backtester import Backtester
+from backend.services.optimizer import AlgorithmOptimizer
+
+@lru_cache(maxsize=1)
+def get_manager() -> DataManager:
+    return DataManager()
+
+@lru_cache(maxsize=1)
+def get_database() -> SportsDatabase:
+    return SportsDatabase()
+
+@lru_cache(maxsize=1)
+def get_engine() -> AdvancedPredictionEngine:
+    return AdvancedPredictionEngine()
+
+@lru_cache(maxsize=1)
+def get_backtester() -> Backtester:
+    return Backtester()
+
+@lru_cache(maxsize=1)
+def get_optimizer() -> AlgorithmOptimizer:
+    return AlgorithmOptimizer()
+
+@lru_cache(maxsize=1)
+def get_prediction_data() -> dict:
+    return get_manager().get_prediction_data()
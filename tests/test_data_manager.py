@@ -7,8 +7,7 @@ import os
 # Add backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from backend.services.data_manager import DataManager
-import json
+from shared_components import get_manager
 from datetime import datetime
 
 def test_data_manager():
@@ -17,7 +16,7 @@ def test_data_manager():
     print("=" * 60)
     
     # Initialize data manager
-    manager = DataManager()
+    manager = get_manager()
     
     # Test 1: Check collector status
     print("\nTest 1: Collector Status")
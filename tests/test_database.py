@@ -7,8 +7,7 @@ import os
 # Add backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from backend.models.database import SportsDatabase
-from backend.services.data_manager import DataManager
+from shared_components import get_database, get_manager
 
 def test_database():
     """Test database functionality"""
@@ -16,8 +15,8 @@ def test_database():
     print("=" * 50)
     
     # Initialize database
-    db = SportsDatabase()
-    manager = DataManager()
+    db = get_database()
+    manager = get_manager()
     
     # Test 1: Database initialization
     print("\nTest 1: Database Status")
@@ -32,26 +31,30 @@ def test_database():
     print("\nTest 2: Collecting and Saving Data")
     print("-" * 25)
     
+    save_error = None
     try:
-        # Collect team data
+        # Collect team and game data
         print("  Collecting teams...")
         team_data = manager.collect_team_data()
-        
-        if team_data['teams']:
-            teams_saved = db.save_teams(team_data['teams'])
-            print(f"  ✅ Saved {teams_saved} teams")
-        
-        # Collect game data
         print("  Collecting games...")
         game_data = manager.collect_game_data(include_weather=False)
         
-        if game_data['games']:
-            games_saved = db.save_games(game_data['games'])
-            print(f"  ✅ Saved {games_saved} games")
-        else:
-            print("  ⚠️  No games to save")
+        # Save both in one transaction (a single commit); a failed save rolls back both
+        with db.transaction():
+            if team_data['teams']:
+                teams_saved = db.save_teams(team_data['teams'])
+                assert teams_saved == len(team_data['teams']), f"saved {teams_saved}/{len(team_data['teams'])} teams"
+                print(f"  ✅ Saved {teams_saved} teams")
+            
+            if game_data['games']:
+                games_saved = db.save_games(game_data['games'])
+                assert games_saved == len(game_data['games']), f"saved {games_saved}/{len(game_data['games'])} games"
+                print(f"  ✅ Saved {games_saved} games")
+            else:
+                print("  ⚠️  No games to save")
         
     except Exception as e:
+        save_error = e
         print(f"  ❌ Error collecting/saving data: {e}")
     
     # Test 3: Retrieve data
@@ -90,10 +93,14 @@ def test_database():
     print("\n" + "=" * 50)
     print("Database Test Complete")
     
-    if final_stats['teams'] > 0:
+    if save_error is not None:
+        print("❌ Saving collected data failed - check the errors above")
+    elif final_stats['teams'] > 0:
         print("✅ Database ready for Step 3: Algorithm Development")
     else:
         print("❌ No data in database - check data collection")
+    
+    assert save_error is None, f"Saving collected data failed: {save_error}"
 
 if __name__ == "__main__":
     test_database()
\ No newline at end of file
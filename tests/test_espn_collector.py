@@ -8,7 +8,6 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from backend.services.espn_collector import ESPNCollector
-import json
 from datetime import datetime
 
 def test_espn_collector():
@@ -5,8 +5,8 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from backend.services.prediction_engine import AdvancedPredictionEngine
-import json
+from shared_components import get_engine
+import numpy as np
 
 def test_prediction_engine():
     """Test the prediction engine functionality"""
@@ -14,7 +14,7 @@ def test_prediction_engine():
     print("=" * 60)
     
     # Initialize prediction engine
-    engine = AdvancedPredictionEngine()
+    engine = get_engine()
     
     # Test 1: Generate predictions for current games
     print("\nTest 1: Generating Game Predictions")
@@ -77,29 +77,23 @@ def test_prediction_engine():
     print("-" * 40)
     
     if predictions:
-        # Analyze factor importance across all predictions
-        factor_summary = {}
+        # Analyze factor importance across all predictions: flatten every factor into
+        # parallel arrays, then group by name with bincount
+        factors = [factor for pred in predictions for factor in pred.factors]
+        names = [factor.name for factor in factors]
+        impacts = np.fromiter((abs(factor.value) for factor in factors), dtype=np.float64, count=len(factors))
+        confidences = np.fromiter((factor.confidence for factor in factors), dtype=np.float64, count=len(factors))
         
-        for pred in predictions:
-            for factor in pred.factors:
-                if factor.name not in factor_summary:
-                    factor_summary[factor.name] = {
-                        'total_impact': 0,
-                        'count': 0,
-                        'avg_confidence': 0
-                    }
-                
-                factor_summary[factor.name]['total_impact'] += abs(factor.value)
-                factor_summary[factor.name]['count'] += 1
-                factor_summary[factor.name]['avg_confidence'] += factor.confidence
+        unique_names, first_index, inverse, counts = np.unique(
+            names, return_index=True, return_inverse=True, return_counts=True
+        )
+        avg_impacts = np.bincount(inverse, weights=impacts) / counts
+        avg_confidences = np.bincount(inverse, weights=confidences) / counts
         
-        # Calculate averages
+        # Calculate averages, reported in first-seen order
         print("   Factor importance across all predictions:")
-        for name, data in factor_summary.items():
-            avg_impact = data['total_impact'] / data['count'] if data['count'] > 0 else 0
-            avg_confidence = data['avg_confidence'] / data['count'] if data['count'] > 0 else 0
-            
-            print(f"     {name}: {avg_impact:.1f} avg impact, {avg_confidence:.1%} confidence")
+        for i in np.argsort(first_index):
+            print(f"     {unique_names[i]}: {avg_impacts[i]:.1f} avg impact, {avg_confidences[i]:.1%} confidence")
     
     print("\n" + "=" * 60)
     print("Prediction Engine Test Complete")